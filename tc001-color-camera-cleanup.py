@@ -1,5 +1,4 @@
 #!/usr/bin/env python3
-import contextlib
 import importlib.util
 import os
 import sys
@@ -26,14 +25,14 @@ _common = _load_common_module()
 def main() -> int:
     _common._require_root()
     v4l2loopback_ctl = _common._which("v4l2loopback-ctl")
-    lock_fd = _common._acquire_v4l2loopback_lock()
-    try:
-        connected_keys = _common._connected_tc001_identity_keys()
+    with _common._v4l2_lock():
+        loopbacks, connected_keys, busy_rdevs = _common._enumerate_tc001_state()
         removed = 0
         preserved = 0
+        _busy = _common._busy_node_checker(busy_rdevs)
 
         by_key = {}
-        for record in _common._list_tc001_loopback_nodes():
+        for record in loopbacks:
             node_key = record[2]
             by_key.setdefault(node_key, []).append(record)
 
@@ -42,7 +41,7 @@ def main() -> int:
 
             keeper_idx, keeper_node, _ = ordered[0]
             for idx, node, _ in ordered:
-                if _common._video_node_busy(node):
+                if _busy(node):
                     keeper_idx = idx
                     keeper_node = node
                     break
@@ -50,12 +49,10 @@ def main() -> int:
             for idx, node, _ in ordered:
                 if idx == keeper_idx and node == keeper_node:
                     continue
-                if _common._video_node_busy(node):
+                if _busy(node):
                     preserved += 1
                     continue
-                if _common._delete_tc001_loopback_dst_unlocked(
-                    v4l2loopback_ctl, idx, expected_key=node_key
-                ):
+                if _common._delete_tc001_loopback_dst_verified(v4l2loopback_ctl, idx):
                     removed += 1
                 else:
                     preserved += 1
@@ -63,11 +60,11 @@ def main() -> int:
             if node_key in connected_keys:
                 preserved += 1
                 continue
-            if _common._video_node_busy(keeper_node):
+            if _busy(keeper_node):
                 preserved += 1
                 continue
-            if _common._delete_tc001_loopback_dst_unlocked(
-                v4l2loopback_ctl, keeper_idx, expected_key=node_key
+            if _common._delete_tc001_loopback_dst_verified(
+                v4l2loopback_ctl, keeper_idx
             ):
                 removed += 1
             else:
@@ -77,9 +74,6 @@ def main() -> int:
             f"Cleanup complete: removed={removed} preserved={preserved}",
             file=sys.stderr,
         )
-    finally:
-        with contextlib.suppress(Exception):
-            os.close(lock_fd)
     return 0
 
 
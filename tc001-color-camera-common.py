@@ -1,16 +1,28 @@
 #!/usr/bin/env python3
+import concurrent.futures
+import contextlib
+import ctypes
+import ctypes.util
+import dataclasses
 import fcntl
+import functools
 import hashlib
 import os
-import re
+import select
+import stat
 import subprocess  # nosec B404: required; calls use argv lists without shell
 import time
-from typing import List, Optional, Sequence, Tuple
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple
 
 _TC001_LOOPBACK_NAME = "TC001 Color Camera"
-_TC001_LOOPBACK_KEY_RE = re.compile(r"^TC001 Color Camera \[([0-9a-f]{10})\]$")
+_TC001_LOOPBACK_NAME_PREFIX = f"{_TC001_LOOPBACK_NAME} ["
+_V4L_SYS_CLASS = "/sys/class/video4linux/"
+_VIRTUAL_V4L_DEV_PREFIX = "/sys/devices/virtual/video4linux/"
+_DEV_VIDEO_PREFIX = "/dev/video"
+_HEX_DIGITS = frozenset("0123456789abcdef")
 
 
+@functools.lru_cache(maxsize=16)
 def _which(cmd: str) -> str:
     trusted_dirs = (
         "/usr/local/sbin",
@@ -22,7 +34,11 @@ def _which(cmd: str) -> str:
     )
     for path_dir in trusted_dirs:
         candidate = os.path.join(path_dir, cmd)
-        if os.path.isfile(candidate) and os.access(candidate, os.X_OK):
+        try:
+            st = os.stat(candidate)
+        except OSError:
+            continue
+        if stat.S_ISREG(st.st_mode) and st.st_mode & 0o111:
             return candidate
     raise FileNotFoundError(f"{cmd} not found in trusted dirs {':'.join(trusted_dirs)}")
 
@@ -38,6 +54,16 @@ def _read_text(path: str) -> str:
         return file_handle.read().strip()
 
 
+def _read_small(path: str, *, dir_fd: Optional[int] = None) -> str:
+    fd = os.open(path, os.O_RDONLY | getattr(os, "O_CLOEXEC", 0), dir_fd=dir_fd)
+    try:
+        # sysfs attributes are at most one page.
+        data = os.read(fd, 4096)
+    finally:
+        os.close(fd)
+    return data.decode("utf-8", "replace").strip()
+
+
 def _parse_nonnegative_int(raw: str, flag_name: str) -> int:
     text = raw.strip()
     if not text.isdigit():
@@ -45,6 +71,12 @@ def _parse_nonnegative_int(raw: str, flag_name: str) -> int:
     return int(text)
 
 
+def _instance_run_path(bus: int, dev: int, suffix: str) -> str:
+    # Per-camera runtime state (instance lock, last good source node), keyed
+    # by USB bus/device number so a replug starts fresh.
+    return f"/run/tc001-color-camera-{bus:03d}-{dev:03d}{suffix}"
+
+
 def _require_root() -> None:
     if os.geteuid() != 0:
         raise PermissionError(
@@ -52,48 +84,317 @@ def _require_root() -> None:
         )
 
 
+@functools.lru_cache(maxsize=None)
+def _libc() -> ctypes.CDLL:
+    return ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+
+
+def _inotify_dev_watch() -> Optional[int]:
+    # Watch /dev for video node creation/removal; None when unavailable.
+    in_create = 0x00000100
+    in_delete = 0x00000200
+    try:
+        libc = _libc()
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+    except Exception:
+        return None
+    if fd < 0:
+        return None
+    if libc.inotify_add_watch(fd, b"/dev", in_create | in_delete) < 0:
+        os.close(fd)
+        return None
+    return fd
+
+
+def _wait_until(predicate: Callable[[], bool], timeout_s: float) -> bool:
+    deadline = time.monotonic() + timeout_s
+    # Usually already true; only pay for the inotify fd when we must wait.
+    # The loop re-checks right after arming, so no event can slip in between.
+    if predicate():
+        return True
+    watch_fd = _inotify_dev_watch()
+    delay = 0.001
+    yields = 2
+    try:
+        while True:
+            if predicate():
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            # Freshly triggered changes often land within a reschedule.
+            if yields:
+                yields -= 1
+                time.sleep(0)
+                continue
+            # /dev events wake us immediately; sysfs attributes do not emit
+            # any, so re-check with a backoff from 1 ms up to 50 ms.
+            wait_s = min(delay, remaining)
+            delay = min(delay * 2, 0.05)
+            if watch_fd is None:
+                time.sleep(wait_s)
+                continue
+            try:
+                readable, _, _ = select.select([watch_fd], [], [], wait_s)
+            except InterruptedError:
+                continue
+            if readable:
+                with contextlib.suppress(BlockingIOError):
+                    while os.read(watch_fd, 4096):
+                        pass
+    finally:
+        if watch_fd is not None:
+            with contextlib.suppress(Exception):
+                os.close(watch_fd)
+
+
+_FINIT_MODULE_SYSCALL_NRS = {"x86_64": 313, "aarch64": 273}
+_MODPROBE_CONFIG_DIRS = (
+    "/etc/modprobe.d",
+    "/run/modprobe.d",
+    "/usr/local/lib/modprobe.d",
+    "/usr/lib/modprobe.d",
+    "/lib/modprobe.d",
+)
+
+
+def _v4l2loopback_module_path() -> Optional[str]:
+    # Uncompressed module whose dependencies are already loaded, else None.
+    modules_dir = f"/lib/modules/{os.uname().release}"
+    try:
+        with open(os.path.join(modules_dir, "modules.dep"), "r", encoding="utf-8") as f:
+            for line in f:
+                path, _, deps = line.partition(":")
+                if not path.endswith("/v4l2loopback.ko"):
+                    continue
+                for dep in deps.split():
+                    dep_name = os.path.basename(dep).split(".ko", 1)[0]
+                    if not os.path.isdir(f"/sys/module/{dep_name.replace('-', '_')}"):
+                        return None
+                return os.path.join(modules_dir, path)
+    except OSError:
+        return None
+    return None
+
+
+def _v4l2loopback_has_modprobe_config() -> bool:
+    # finit_module() skips modprobe.d options/blacklist/install rules and
+    # kernel command line parameters; leave the module to modprobe if any exist.
+    try:
+        with open("/proc/cmdline", "r", encoding="utf-8") as f:
+            if "v4l2loopback." in f.read():
+                return True
+    except OSError:
+        pass
+    for config_dir in _MODPROBE_CONFIG_DIRS:
+        try:
+            names = os.listdir(config_dir)
+        except OSError:
+            continue
+        for name in names:
+            if not name.endswith(".conf"):
+                continue
+            try:
+                with open(os.path.join(config_dir, name), "r", encoding="utf-8") as f:
+                    for line in f:
+                        if "v4l2loopback" in line.partition("#")[0].split():
+                            return True
+            except (OSError, UnicodeDecodeError):
+                continue
+    return False
+
+
+def _finit_v4l2loopback() -> bool:
+    if _v4l2loopback_has_modprobe_config():
+        return False
+    nr = _FINIT_MODULE_SYSCALL_NRS.get(os.uname().machine)
+    module_path = _v4l2loopback_module_path()
+    if nr is None or module_path is None:
+        return False
+    try:
+        fd = os.open(module_path, os.O_RDONLY | os.O_CLOEXEC)
+    except OSError:
+        return False
+    try:
+        libc = _libc()
+        return libc.syscall(nr, fd, b"devices=0", 0) == 0
+    except Exception:
+        return False
+    finally:
+        os.close(fd)
+
+
+def _load_v4l2loopback(modprobe: str) -> None:
+    if os.path.isdir("/sys/module/v4l2loopback"):
+        return
+    # Loading the module in-process saves a modprobe fork/exec per hotplug.
+    if _finit_v4l2loopback():
+        return
+    _run([modprobe, "v4l2loopback", "devices=0"])
+
+
+def _open_sysfs_dir(path: str) -> int:
+    flags = os.O_DIRECTORY | getattr(os, "O_PATH", os.O_RDONLY)
+    if hasattr(os, "O_CLOEXEC"):
+        flags |= os.O_CLOEXEC
+    return os.open(path, flags)
+
+
 def _sysfs_video_dir(video_node: str) -> str:
     video_basename = os.path.basename(video_node)
-    return os.path.realpath(f"/sys/class/video4linux/{video_basename}/device")
+    class_link = _V4L_SYS_CLASS + video_basename
+    # Two readlink() calls instead of realpath()'s lstat() per component;
+    # every directory under /sys/devices is real, so normpath is exact.
+    try:
+        class_dir = os.path.normpath(
+            os.path.join(os.path.dirname(class_link), os.readlink(class_link))
+        )
+    except OSError:
+        return os.path.realpath(os.path.join(class_link, "device"))
+    device_link = os.path.join(class_dir, "device")
+    try:
+        return os.path.normpath(os.path.join(class_dir, os.readlink(device_link)))
+    except OSError:
+        # Virtual (loopback) nodes have no parent device link.
+        return device_link
 
 
 def _sysfs_find_up(start_dir: str, filenames: Sequence[str]) -> Optional[str]:
+    return _sysfs_find_up_cached(start_dir, frozenset(filenames))
+
+
+@functools.lru_cache(maxsize=4096)
+def _sysfs_find_up_cached(start_dir: str, filenames: frozenset[str]) -> Optional[str]:
     current_dir = start_dir
     while current_dir.startswith("/sys/") and current_dir != "/sys":
-        if all(
-            os.path.exists(os.path.join(current_dir, filename))
-            for filename in filenames
-        ):
+        try:
+            with os.scandir(current_dir) as entries:
+                names = {entry.name for entry in entries}
+        except OSError:
+            names = set()
+        if filenames.issubset(names):
             return current_dir
         current_dir = os.path.dirname(current_dir)
     return None
 
 
-def _video_usb_vid_pid(video_node: str) -> Optional[Tuple[int, int]]:
+@dataclasses.dataclass(frozen=True)
+class _SysfsSnapshot:
+    dev_dir: str
+    name: Optional[str]
+    index: Optional[str]
+    usb_dir: Optional[str]
+    vid: Optional[int]
+    pid: Optional[int]
+    serial: str
+    busnum: Optional[int]
+    devnum: Optional[int]
+
+
+# Per-run cache keyed by video basename; entries are dropped whenever this
+# process adds or deletes a loopback node.
+_SYSFS_SNAPSHOTS: dict[str, _SysfsSnapshot] = {}
+
+
+def _read_sysfs_snapshot(video_basename: str) -> _SysfsSnapshot:
+    class_dir = _V4L_SYS_CLASS + video_basename
+    name: Optional[str] = None
+    index: Optional[str] = None
     try:
-        dev_dir = _sysfs_video_dir(video_node)
+        name = _read_small(os.path.join(class_dir, "name"))
     except Exception:
-        return None
+        name = None
+    try:
+        index = _read_small(os.path.join(class_dir, "index"))
+    except Exception:
+        index = None
+    dev_dir = _sysfs_video_dir(video_basename)
 
-    found = _sysfs_find_up(dev_dir, ("idVendor", "idProduct"))
-    if not found:
-        return None
+    usb_dir = _sysfs_find_up(dev_dir, ("idVendor", "idProduct"))
+    bus_dir = _sysfs_find_up(dev_dir, ("busnum", "devnum"))
+    vid: Optional[int] = None
+    pid: Optional[int] = None
+    serial = ""
+    busnum: Optional[int] = None
+    devnum: Optional[int] = None
+    if usb_dir:
+        # Resolve the USB device directory once; attributes are read
+        # relative to it.
+        usb_fd = -1
+        try:
+            usb_fd = _open_sysfs_dir(usb_dir)
+            vid = int(_read_small("idVendor", dir_fd=usb_fd), 16)
+            pid = int(_read_small("idProduct", dir_fd=usb_fd), 16)
+        except Exception:
+            vid = None
+            pid = None
+        if usb_fd >= 0:
+            try:
+                serial = _read_small("serial", dir_fd=usb_fd)
+            except Exception:
+                serial = ""
+            if bus_dir == usb_dir:
+                try:
+                    busnum = int(_read_small("busnum", dir_fd=usb_fd))
+                    devnum = int(_read_small("devnum", dir_fd=usb_fd))
+                except Exception:
+                    busnum = None
+                    devnum = None
+            with contextlib.suppress(Exception):
+                os.close(usb_fd)
+
+    if bus_dir and bus_dir != usb_dir:
+        try:
+            busnum = int(_read_small(os.path.join(bus_dir, "busnum")))
+            devnum = int(_read_small(os.path.join(bus_dir, "devnum")))
+        except Exception:
+            busnum = None
+            devnum = None
+
+    return _SysfsSnapshot(
+        dev_dir=dev_dir,
+        name=name,
+        index=index,
+        usb_dir=usb_dir,
+        vid=vid,
+        pid=pid,
+        serial=serial,
+        busnum=busnum,
+        devnum=devnum,
+    )
+
+
+def _sysfs_snapshot(video_node: str) -> _SysfsSnapshot:
+    video_basename = os.path.basename(video_node)
+    snapshot = _SYSFS_SNAPSHOTS.get(video_basename)
+    if snapshot is not None:
+        return snapshot
+    snapshot = _read_sysfs_snapshot(video_basename)
+    # Nodes whose attributes are not readable (yet) are re-read next time.
+    if snapshot.name is not None:
+        _SYSFS_SNAPSHOTS[video_basename] = snapshot
+    return snapshot
+
+
+def _forget_sysfs_snapshot(video_node: str) -> None:
+    _SYSFS_SNAPSHOTS.pop(os.path.basename(video_node), None)
+
+
+def _video_usb_vid_pid(video_node: str) -> Optional[Tuple[int, int]]:
     try:
-        vid = int(_read_text(os.path.join(found, "idVendor")), 16)
-        pid = int(_read_text(os.path.join(found, "idProduct")), 16)
-        return vid, pid
+        snapshot = _sysfs_snapshot(video_node)
     except Exception:
         return None
+    if snapshot.vid is None or snapshot.pid is None:
+        return None
+    return snapshot.vid, snapshot.pid
 
 
 def _video_usb_bus_device_numbers(video_node: str) -> Tuple[int, int]:
-    dev_dir = _sysfs_video_dir(video_node)
-    found = _sysfs_find_up(dev_dir, ("busnum", "devnum"))
-    if not found:
+    snapshot = _sysfs_snapshot(video_node)
+    if snapshot.busnum is None or snapshot.devnum is None:
         raise RuntimeError(f"Unable to locate USB busnum/devnum for {video_node}")
-    bus = int(_read_text(os.path.join(found, "busnum")))
-    dev = int(_read_text(os.path.join(found, "devnum")))
-    return bus, dev
+    return snapshot.busnum, snapshot.devnum
 
 
 def _is_tc001(video_node: str) -> bool:
@@ -106,23 +407,12 @@ def _tc001_usb_identity(video_node: str) -> str:
     if ids is None:
         raise RuntimeError(f"Unable to identify USB VID:PID for {video_node}")
     vid, pid = ids
-    dev_dir = _sysfs_video_dir(video_node)
-    found = _sysfs_find_up(dev_dir, ("idVendor", "idProduct"))
-
-    serial = ""
-    path_key = ""
-    if found:
-        path_key = os.path.basename(found)
-        serial_path = os.path.join(found, "serial")
-        try:
-            if os.path.exists(serial_path):
-                serial = _read_text(serial_path)
-        except Exception:
-            serial = ""
+    snapshot = _sysfs_snapshot(video_node)
 
-    if serial:
-        return f"vid={vid:04x};pid={pid:04x};serial={serial}"
-    if path_key:
+    if snapshot.serial:
+        return f"vid={vid:04x};pid={pid:04x};serial={snapshot.serial}"
+    if snapshot.usb_dir:
+        path_key = os.path.basename(snapshot.usb_dir)
         return f"vid={vid:04x};pid={pid:04x};path={path_key}"
 
     bus, dev = _video_usb_bus_device_numbers(video_node)
@@ -131,10 +421,12 @@ def _tc001_usb_identity(video_node: str) -> str:
 
 def _tc001_identity_key(video_node: str) -> str:
     identity = _tc001_usb_identity(video_node)
+    # Same value as hexdigest()[:10]; keys name existing loopback nodes, so
+    # the hash must not change.
     digest = hashlib.sha1(  # nosec B303: non-cryptographic stable key derivation
-        identity.encode("utf-8")
-    ).hexdigest()
-    return digest[:10]
+        identity.encode("utf-8"), usedforsecurity=False
+    ).digest()
+    return digest[:5].hex()
 
 
 def _tc001_loopback_name_for_key(key: str) -> str:
@@ -142,25 +434,34 @@ def _tc001_loopback_name_for_key(key: str) -> str:
 
 
 def _parse_tc001_loopback_name(name: str) -> Tuple[bool, Optional[str]]:
-    match = _TC001_LOOPBACK_KEY_RE.fullmatch(name)
-    if not match:
+    # Fixed layout "<prefix>[<10 lowercase hex>]"; most names fail the
+    # prefix test.
+    if not name.startswith(_TC001_LOOPBACK_NAME_PREFIX):
+        return False, None
+    if len(name) != len(_TC001_LOOPBACK_NAME_PREFIX) + 11 or name[-1] != "]":
+        return False, None
+    key = name[len(_TC001_LOOPBACK_NAME_PREFIX) : -1]
+    if not _HEX_DIGITS.issuperset(key):
         return False, None
-    return True, match.group(1)
+    return True, key
 
 
 def _lowest_free_video_nr() -> int:
     used = set()
     try:
-        entries = os.listdir("/dev")
+        dev_entries = os.scandir("/dev")
     except OSError as exc:
         raise RuntimeError(f"Cannot list /dev: {exc}") from exc
 
-    for name in entries:
-        if not name.startswith("video"):
-            continue
-        suffix = name[5:]
-        if suffix.isdigit():
-            used.add(int(suffix))
+    with dev_entries:
+        for entry in dev_entries:
+            name = entry.name
+            if not name.startswith("video"):
+                continue
+            try:
+                used.add(int(name[5:]))
+            except ValueError:
+                continue
 
     n = 0
     while n in used:
@@ -169,9 +470,8 @@ def _lowest_free_video_nr() -> int:
 
 
 def _list_video_nodes() -> List[str]:
-    base = "/sys/class/video4linux"
     try:
-        entries = os.listdir(base)
+        entries = os.listdir(_V4L_SYS_CLASS)
     except OSError:
         return []
     nodes: List[str] = []
@@ -181,7 +481,7 @@ def _list_video_nodes() -> List[str]:
         suffix = entry[5:]
         if not suffix.isdigit():
             continue
-        nodes.append(f"/dev/{entry}")
+        nodes.append("/dev/" + entry)
 
     def _video_num(video_path: str) -> int:
         try:
@@ -192,11 +492,90 @@ def _list_video_nodes() -> List[str]:
     return sorted(nodes, key=_video_num)
 
 
+def _sysfs_sibling_devices(preferred: str) -> List[str]:
+    # readlink-based resolution (see _sysfs_video_dir) costs two syscalls
+    # per entry instead of an lstat() per path component.
+    try:
+        dev_real = _sysfs_video_dir(preferred)
+    except OSError:
+        return [preferred]
+
+    candidates: List[str] = []
+    try:
+        entries = os.scandir(_V4L_SYS_CLASS)
+    except OSError:
+        return [preferred]
+    with entries:
+        for dir_entry in entries:
+            entry = dir_entry.name
+            if not entry.startswith("video"):
+                continue
+            try:
+                entry_real = _sysfs_video_dir(entry)
+            except OSError:
+                continue
+            if entry_real == dev_real:
+                candidates.append("/dev/" + entry)
+
+    def _video_num(video_path: str) -> int:
+        try:
+            return int(os.path.basename(video_path).replace("video", ""))
+        except Exception:
+            return 1_000_000
+
+    candidates = sorted(set(candidates), key=_video_num)
+    if preferred in candidates:
+        candidates.remove(preferred)
+        candidates.insert(0, preferred)
+    return candidates or [preferred]
+
+
+def _wait_for_tc001_device_nodes(video_node: str, timeout_s: float = 1.0) -> List[str]:
+    # Returns the sibling nodes seen by the last check, for callers to reuse.
+    nodes: List[str] = []
+    try:
+        class_fd: Optional[int] = _open_sysfs_dir(_V4L_SYS_CLASS)
+    except OSError:
+        class_fd = None
+    # Index reads resolve relative to the class dir fd when it is open.
+    index_prefix = _V4L_SYS_CLASS if class_fd is None else ""
+
+    def _both_interfaces_present() -> bool:
+        nonlocal nodes
+        nodes = _sysfs_sibling_devices(video_node)
+        seen_0 = seen_1 = False
+        for node in nodes:
+            index_path = index_prefix + os.path.basename(node) + "/index"
+            try:
+                fd = os.open(index_path, os.O_RDONLY | os.O_CLOEXEC, dir_fd=class_fd)
+            except OSError:
+                continue
+            try:
+                index_value = os.read(fd, 16).rstrip()
+            except OSError:
+                continue
+            finally:
+                os.close(fd)
+            if index_value == b"0":
+                seen_0 = True
+            elif index_value == b"1":
+                seen_1 = True
+            if seen_0 and seen_1:
+                return True
+        return False
+
+    try:
+        _wait_until(_both_interfaces_present, timeout_s)
+    finally:
+        if class_fd is not None:
+            os.close(class_fd)
+    return nodes
+
+
 def _list_tc001_loopback_nodes() -> List[Tuple[int, str, Optional[str]]]:
     nodes: List[Tuple[int, str, Optional[str]]] = []
-    base = "/sys/class/video4linux"
     try:
-        entries = os.listdir(base)
+        entries = os.listdir(_V4L_SYS_CLASS)
     except OSError:
         return nodes
     for entry in entries:
@@ -205,85 +584,144 @@ def _list_tc001_loopback_nodes() -> List[Tuple[int, str, Optional[str]]]:
         suffix = entry[5:]
         if not suffix.isdigit():
             continue
-        class_dir = os.path.join(base, entry)
-        name: Optional[str] = None
-        dev_real: Optional[str] = None
-        try:
-            name = _read_text(os.path.join(class_dir, "name"))
-            dev_real = os.path.realpath(os.path.join(class_dir, "device"))
-        except Exception:
-            name = None
-            dev_real = None
-        if name is None or dev_real is None:
+        snapshot = _sysfs_snapshot(entry)
+        name = snapshot.name
+        if name is None:
             continue
         is_tc001_name, node_key = _parse_tc001_loopback_name(name)
         if not is_tc001_name:
             continue
-        if not dev_real.startswith("/sys/devices/virtual/video4linux/"):
+        if not snapshot.dev_dir.startswith(_VIRTUAL_V4L_DEV_PREFIX):
             continue
-        nodes.append((int(suffix), f"/dev/{entry}", node_key))
+        nodes.append((int(suffix), "/dev/" + entry, node_key))
     nodes.sort(key=lambda item: item[0])
     return nodes
 
 
+def _tc001_identity_key_or_none(video_node: str) -> Optional[str]:
+    if not _is_tc001(video_node):
+        return None
+    try:
+        return _tc001_identity_key(video_node)
+    except Exception:
+        return None
+
+
 def _connected_tc001_identity_keys() -> set[str]:
     keys: set[str] = set()
+    nodes = _list_video_nodes()
+    if not nodes:
+        return keys
+    # Each lookup is a chain of small sysfs syscalls; overlap them.
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=min(8, len(nodes))
+    ) as executor:
+        for node_key in executor.map(_tc001_identity_key_or_none, nodes):
+            if node_key is None:
+                continue
+            keys.add(node_key)
+    return keys
+
+
+def _enumerate_tc001_state() -> (
+    Tuple[List[Tuple[int, str, Optional[str]]], set[str], set[int]]
+):
+    # One pass over /sys/class/video4linux plus one /proc walk, for callers
+    # that need loopback records, connected keys and busy nodes together.
+    loopbacks: List[Tuple[int, str, Optional[str]]] = []
+    connected_keys: set[str] = set()
     for node in _list_video_nodes():
-        if not _is_tc001(node):
+        if _is_tc001(node):
+            node_key = _tc001_identity_key_or_none(node)
+            if node_key is not None:
+                connected_keys.add(node_key)
             continue
-        node_key: Optional[str] = None
-        try:
-            node_key = _tc001_identity_key(node)
-        except Exception:
-            node_key = None
+        node_key = _tc001_loopback_node_key(node)
         if node_key is None:
             continue
-        keys.add(node_key)
-    return keys
+        loopbacks.append((int(os.path.basename(node)[5:]), node, node_key))
+    return loopbacks, connected_keys, _busy_video_rdevs()
 
 
-def _video_node_busy(video_node: str) -> bool:
+def _iter_open_video_fds() -> Iterator[Tuple[str, str]]:
+    # Yields (link target, /proc/<pid>/fd/<n>) for fds open on /dev/video*.
     try:
-        target = os.path.realpath(video_node)
-    except Exception:
-        return False
-    if not target:
-        return False
+        proc_entries = os.scandir("/proc")
+    except OSError:
+        return
+    with proc_entries:
+        for proc_entry in proc_entries:
+            if not proc_entry.name.isdigit():
+                continue
+            try:
+                fd_entries = os.scandir(os.path.join(proc_entry.path, "fd"))
+            except OSError:
+                continue
+            with fd_entries:
+                for fd_entry in fd_entries:
+                    try:
+                        link = os.readlink(fd_entry.path)
+                    except OSError:
+                        continue
+                    if link.startswith(_DEV_VIDEO_PREFIX):
+                        yield link, fd_entry.path
+
+
+def _busy_video_rdevs() -> set[int]:
+    rdevs: set[int] = set()
+    for _, fd_path in _iter_open_video_fds():
+        try:
+            rdevs.add(os.stat(fd_path).st_rdev)
+        except OSError:
+            continue
+    return rdevs
+
+
+def _busy_node_checker(
+    busy_rdevs: Optional[set[int]] = None,
+) -> Callable[[str], bool]:
+    # One /proc fd scan answers the busy check for any number of nodes;
+    # each node's st_rdev is looked up once.
+    if busy_rdevs is None:
+        busy_rdevs = _busy_video_rdevs()
+    node_rdevs: dict[str, Optional[int]] = {}
+
+    def _busy(node: str) -> bool:
+        if node not in node_rdevs:
+            try:
+                node_rdevs[node] = os.stat(node).st_rdev
+            except OSError:
+                node_rdevs[node] = None
+        return node_rdevs[node] in busy_rdevs
+
+    return _busy
+
+
+def _video_node_busy(video_node: str) -> bool:
     try:
-        pids = os.listdir("/proc")
+        target_rdev = os.stat(video_node).st_rdev
     except OSError:
         return False
-    for pid in pids:
-        if not pid.isdigit():
-            continue
-        fd_dir = f"/proc/{pid}/fd"
+    for link, fd_path in _iter_open_video_fds():
+        # The fd link already names the node; only other spellings need
+        # the rdev comparison.
+        if link == video_node:
+            return True
         try:
-            fds = os.listdir(fd_dir)
-        except Exception:
-            fds = []
-        for fd_name in fds:
-            fd_path = os.path.join(fd_dir, fd_name)
-            same_target = False
-            try:
-                same_target = os.path.realpath(fd_path) == target
-            except Exception:
-                same_target = False
-            if same_target:
+            if os.stat(fd_path).st_rdev == target_rdev:
                 return True
+        except OSError:
+            continue
     return False
 
 
 def _tc001_loopback_node_key(video_node: str) -> Optional[str]:
-    video_basename = os.path.basename(video_node)
-    class_dir = f"/sys/class/video4linux/{video_basename}"
-    try:
-        name = _read_text(os.path.join(class_dir, "name"))
-        dev_real = os.path.realpath(os.path.join(class_dir, "device"))
-    except Exception:
+    snapshot = _sysfs_snapshot(video_node)
+    if snapshot.name is None:
         return None
-    if not dev_real.startswith("/sys/devices/virtual/video4linux/"):
+    if not snapshot.dev_dir.startswith(_VIRTUAL_V4L_DEV_PREFIX):
         return None
-    is_tc001_name, node_key = _parse_tc001_loopback_name(name)
+    is_tc001_name, node_key = _parse_tc001_loopback_name(snapshot.name)
     if not is_tc001_name:
         return None
     return node_key
@@ -314,6 +752,16 @@ def _acquire_v4l2loopback_lock() -> int:
     return fd
 
 
+@contextlib.contextmanager
+def _v4l2_lock() -> Iterator[int]:
+    fd = _acquire_v4l2loopback_lock()
+    try:
+        yield fd
+    finally:
+        with contextlib.suppress(Exception):
+            os.close(fd)
+
+
 def _delete_tc001_loopback_dst_unlocked(
     v4l2loopback_ctl: str,
     dst_video_index: int,
@@ -326,8 +774,171 @@ def _delete_tc001_loopback_dst_unlocked(
         return True
     if not _is_tc001_loopback_node(dst, expected_key=expected_key):
         return False
+    return _delete_tc001_loopback_dst_verified(
+        v4l2loopback_ctl, dst_video_index, timeout_s=timeout_s
+    )
+
+
+def _delete_tc001_loopback_dst_verified(
+    v4l2loopback_ctl: str,
+    dst_video_index: int,
+    *,
+    timeout_s: float = 1.0,
+) -> bool:
+    # Caller holds the v4l2loopback lock and has already classified the node.
+    dst = f"/dev/video{dst_video_index}"
     _run([v4l2loopback_ctl, "delete", str(dst_video_index)], check=False)
-    deadline = time.monotonic() + timeout_s
-    while os.path.exists(dst) and time.monotonic() < deadline:
-        time.sleep(0.05)
-    return not os.path.exists(dst)
+    _forget_sysfs_snapshot(dst)
+    return _wait_until(lambda: not os.path.exists(dst), timeout_s)
+
+
+class _V4l2LoopbackConfig013(ctypes.Structure):
+    # struct v4l2_loopback_config from v4l2loopback.h (0.13.x).
+    _fields_ = [
+        ("output_nr", ctypes.c_int32),
+        ("capture_nr", ctypes.c_int32),
+        ("card_label", ctypes.c_char * 32),
+        ("min_width", ctypes.c_uint32),
+        ("max_width", ctypes.c_uint32),
+        ("min_height", ctypes.c_uint32),
+        ("max_height", ctypes.c_uint32),
+        ("max_buffers", ctypes.c_int32),
+        ("max_openers", ctypes.c_int32),
+        ("debug", ctypes.c_int32),
+        ("announce_all_caps", ctypes.c_int32),
+    ]
+
+
+class _V4l2LoopbackConfig012(ctypes.Structure):
+    # struct v4l2_loopback_config from v4l2loopback.h (0.12.x): no min_* fields.
+    _fields_ = [
+        ("output_nr", ctypes.c_int32),
+        ("capture_nr", ctypes.c_int32),
+        ("card_label", ctypes.c_char * 32),
+        ("max_width", ctypes.c_int32),
+        ("max_height", ctypes.c_int32),
+        ("max_buffers", ctypes.c_int32),
+        ("max_openers", ctypes.c_int32),
+        ("debug", ctypes.c_int32),
+        ("announce_all_caps", ctypes.c_int32),
+    ]
+
+
+def _check_struct_layout(struct_type, size: int, offsets: dict[str, int]) -> None:
+    # The ioctl passes raw bytes to the kernel; a layout slip would silently
+    # shift every later field (e.g. lose exclusive caps).
+    actual = {name: getattr(struct_type, name).offset for name in offsets}
+    if ctypes.sizeof(struct_type) != size or actual != offsets:
+        raise RuntimeError(f"{struct_type.__name__} does not match the kernel ABI")
+
+
+_check_struct_layout(
+    _V4l2LoopbackConfig013,
+    72,
+    {"card_label": 8, "min_width": 40, "max_buffers": 56, "announce_all_caps": 68},
+)
+_check_struct_layout(
+    _V4l2LoopbackConfig012,
+    64,
+    {"card_label": 8, "max_width": 40, "max_buffers": 48, "announce_all_caps": 60},
+)
+_V4L2LOOPBACK_CONFIG_BY_VERSION = (
+    ("0.13.", _V4l2LoopbackConfig013),
+    ("0.12.", _V4l2LoopbackConfig012),
+)
+
+
+_V4L2LOOPBACK_CTL_ADD = 0x4C80
+
+
+def _v4l2loopback_ctl_add(dst_video_index: int, loopback_name: str) -> bool:
+    # Same request v4l2loopback-ctl issues, without the fork/exec; False
+    # means the caller should fall back to the tool.
+    try:
+        version = _read_small("/sys/module/v4l2loopback/version")
+    except OSError:
+        return False
+    config_type = next(
+        (
+            layout
+            for prefix, layout in _V4L2LOOPBACK_CONFIG_BY_VERSION
+            if version.startswith(prefix)
+        ),
+        None,
+    )
+    if config_type is None:
+        return False
+    label = loopback_name.encode("utf-8")
+    if len(label) >= 32:
+        return False
+    config = config_type(
+        output_nr=dst_video_index,
+        capture_nr=dst_video_index,
+        card_label=label,
+        max_buffers=-1,
+        max_openers=-1,
+        announce_all_caps=0,
+    )
+    try:
+        fd = os.open("/dev/v4l2loopback", os.O_RDWR | os.O_CLOEXEC)
+    except OSError:
+        return False
+    try:
+        fcntl.ioctl(fd, _V4L2LOOPBACK_CTL_ADD, config)
+    except OSError:
+        return False
+    finally:
+        os.close(fd)
+    return True
+
+
+def _create_loopback_device(
+    v4l2loopback_ctl: str,
+    dst_video_index: int,
+    *,
+    loopback_name: str,
+    expected_key: Optional[str] = None,
+    timeout_s: float = 2.5,
+) -> str:
+    dst = f"/dev/video{dst_video_index}"
+    if not _v4l2loopback_ctl_add(dst_video_index, loopback_name):
+        _run(
+            [
+                v4l2loopback_ctl,
+                "add",
+                "--name",
+                loopback_name,
+                "--exclusive-caps",
+                "1",
+                str(dst_video_index),
+            ]
+        )
+    _forget_sysfs_snapshot(dst)
+    # devtmpfs creates the node after its sysfs attributes, so the name is
+    # final once the path exists; verify it once rather than on every poll.
+    seen_path = _wait_until(lambda: os.path.exists(dst), timeout_s)
+    if seen_path and _is_tc001_loopback_node(dst, expected_key=expected_key):
+        return dst
+    _run([v4l2loopback_ctl, "delete", str(dst_video_index)], check=False)
+    if seen_path:
+        raise RuntimeError(
+            f"Created destination --dst-video-index {dst_video_index} ({dst}) "
+            "is not a TC001 loopback node"
+        )
+    raise FileNotFoundError(dst)
+
+
+def _delete_tc001_loopback_dst(
+    v4l2loopback_ctl: str,
+    dst_video_index: int,
+    *,
+    expected_key: Optional[str] = None,
+    timeout_s: float = 1.0,
+) -> bool:
+    with _v4l2_lock():
+        return _delete_tc001_loopback_dst_unlocked(
+            v4l2loopback_ctl,
+            dst_video_index,
+            expected_key=expected_key,
+            timeout_s=timeout_s,
+        )
@@ -7,7 +7,6 @@ import re
 import shlex
 import subprocess  # nosec B404: required; calls use argv lists without shell
 import sys
-import time
 from typing import List, Optional, Sequence, Tuple
 
 
@@ -33,80 +32,29 @@ _run = _common._run
 _read_text = _common._read_text
 _parse_nonnegative_int = _common._parse_nonnegative_int
 _require_root = _common._require_root
-_sysfs_video_dir = _common._sysfs_video_dir
 _video_usb_vid_pid = _common._video_usb_vid_pid
 _video_usb_bus_device_numbers = _common._video_usb_bus_device_numbers
 _is_tc001 = _common._is_tc001
 _tc001_identity_key = _common._tc001_identity_key
 _tc001_loopback_name_for_key = _common._tc001_loopback_name_for_key
 _lowest_free_video_nr = _common._lowest_free_video_nr
-_list_video_nodes = _common._list_video_nodes
 _list_tc001_loopback_nodes = _common._list_tc001_loopback_nodes
 _connected_tc001_identity_keys = _common._connected_tc001_identity_keys
 _video_node_busy = _common._video_node_busy
+_busy_node_checker = _common._busy_node_checker
 _tc001_loopback_node_key = _common._tc001_loopback_node_key
 _is_tc001_loopback_node = _common._is_tc001_loopback_node
-_acquire_v4l2loopback_lock = _common._acquire_v4l2loopback_lock
+_v4l2_lock = _common._v4l2_lock
 _delete_tc001_loopback_dst_unlocked = _common._delete_tc001_loopback_dst_unlocked
+_delete_tc001_loopback_dst = _common._delete_tc001_loopback_dst
+_wait_for_tc001_device_nodes = _common._wait_for_tc001_device_nodes
+_create_loopback_device = _common._create_loopback_device
+_load_v4l2loopback = _common._load_v4l2loopback
+_instance_run_path = _common._instance_run_path
 
-
-def _sysfs_sibling_devices(preferred: str) -> List[str]:
-    video_basename = os.path.basename(preferred)
-    sys_link = f"/sys/class/video4linux/{video_basename}/device"
-    try:
-        dev_real = os.path.realpath(sys_link)
-    except OSError:
-        return [preferred]
-
-    base = "/sys/class/video4linux"
-    try:
-        entries = os.listdir(base)
-    except OSError:
-        return [preferred]
-
-    candidates: List[str] = []
-    for entry in entries:
-        if not entry.startswith("video"):
-            continue
-        try:
-            entry_real = os.path.realpath(os.path.join(base, entry, "device"))
-        except OSError:
-            continue
-        if entry_real == dev_real:
-            candidates.append(f"/dev/{entry}")
-
-    def _video_num(video_path: str) -> int:
-        try:
-            return int(os.path.basename(video_path).replace("video", ""))
-        except Exception:
-            return 1_000_000
-
-    candidates = sorted(set(candidates), key=_video_num)
-    if preferred in candidates:
-        candidates.remove(preferred)
-        candidates.insert(0, preferred)
-    return candidates or [preferred]
-
-
-def _wait_for_tc001_device_nodes(video_node: str, timeout_s: float = 1.0) -> None:
-    start = time.monotonic()
-    while time.monotonic() - start < timeout_s:
-        nodes = _sysfs_sibling_devices(video_node)
-        indices = set()
-        for node in nodes:
-            video_basename = os.path.basename(node)
-            idx_path = f"/sys/class/video4linux/{video_basename}/index"
-            index_value: Optional[str] = None
-            try:
-                index_value = _read_text(idx_path)
-            except Exception:
-                index_value = None
-            if index_value is None:
-                continue
-            indices.add(index_value)
-        if "0" in indices and "1" in indices:
-            return
-        time.sleep(0.05)
+_RE_DST_VIDEO_INDEX = re.compile(r"--dst-video-index\s+(\d+)")
+_RE_DST_NAME_KEY = re.compile(r"--dst-name-key\s+([0-9a-f]{10})")
+_RE_USB_BUS_DEV = re.compile(r"DeviceAllow=/dev/bus/usb/(\d+)/(\d+) ")
 
 
 def _loopback_state(
@@ -119,43 +67,6 @@ def _loopback_state(
     return "orphan-busy" if busy else "orphan-idle"
 
 
-def _create_loopback_device(
-    v4l2loopback_ctl: str,
-    dst_video_index: int,
-    *,
-    loopback_name: str,
-    expected_key: Optional[str] = None,
-    timeout_s: float = 2.5,
-) -> str:
-    dst = f"/dev/video{dst_video_index}"
-    _run(
-        [
-            v4l2loopback_ctl,
-            "add",
-            "--name",
-            loopback_name,
-            "--exclusive-caps",
-            "1",
-            str(dst_video_index),
-        ]
-    )
-    deadline = time.monotonic() + timeout_s
-    seen_path = False
-    while time.monotonic() < deadline:
-        if os.path.exists(dst):
-            seen_path = True
-            if _is_tc001_loopback_node(dst, expected_key=expected_key):
-                return dst
-        time.sleep(0.05)
-    _run([v4l2loopback_ctl, "delete", str(dst_video_index)], check=False)
-    if seen_path:
-        raise RuntimeError(
-            f"Created destination --dst-video-index {dst_video_index} ({dst}) "
-            "is not a TC001 loopback node"
-        )
-    raise FileNotFoundError(dst)
-
-
 def _last_execstart_from_unit_text(unit_text: str) -> Optional[str]:
     in_service = False
     exec_start_cmds: List[str] = []
@@ -226,21 +137,16 @@ def _configured_dst_video_index(systemctl: str, unit_name: str) -> Optional[int]
 
 
 def _write_runtime_dropin(
+    dropin_path: str,
     *,
-    src_video_index: int,
     dst_video_index: int,
     dst_name_key: str,
     allowed_video_nodes: Sequence[str],
     bus: int,
     dev: int,
-) -> str:
-    unit_name = f"tc001-color-camera@{src_video_index}.service"
-    dropin_dir = f"/run/systemd/system/{unit_name}.d"
-    os.makedirs(dropin_dir, mode=0o755, exist_ok=True)
-    dropin_path = os.path.join(dropin_dir, "10-launcher.conf")
-
+) -> bool:
     dst = f"/dev/video{dst_video_index}"
-    nodes = sorted(set(list(allowed_video_nodes) + [dst]))
+    nodes = sorted({*allowed_video_nodes, dst})
     lines: List[str] = [
         "[Service]",
         (
@@ -252,8 +158,7 @@ def _write_runtime_dropin(
         "DevicePolicy=closed",
         "DeviceAllow=",
     ]
-    for node in nodes:
-        lines.append(f"DeviceAllow={node} rw")
+    lines.extend([f"DeviceAllow={node} rw" for node in nodes])
     lines.append(f"DeviceAllow=/dev/bus/usb/{bus:03d}/{dev:03d} rw")
     lines.extend(
         [
@@ -263,9 +168,23 @@ def _write_runtime_dropin(
             "",
         ]
     )
-    with open(dropin_path, "w", encoding="utf-8") as file_handle:
-        file_handle.write("\n".join(lines))
-    return dropin_path
+    data = "\n".join(lines).encode("utf-8")
+    # An identical drop-in is already what systemd has loaded.
+    with contextlib.suppress(OSError):
+        with open(dropin_path, "rb") as file_handle:
+            if file_handle.read() == data:
+                return False
+    os.makedirs(os.path.dirname(dropin_path), mode=0o755, exist_ok=True)
+    # Write-then-rename so systemd never reads a partially written drop-in.
+    tmp_path = f"{dropin_path}.tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_CLOEXEC, 0o644)
+    try:
+        os.write(fd, data)
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    os.rename(tmp_path, dropin_path)
+    return True
 
 
 def _ensure_dst_video_index(
@@ -321,40 +240,51 @@ def _prune_duplicate_loopbacks_for_key(
         )
 
 
+def _unit_is_active(systemctl: str, unit_name: str) -> bool:
+    result = _run([systemctl, "is-active", "--quiet", unit_name], check=False)
+    return result.returncode == 0
+
+
 def _runtime_dropin_path(src_video_index: int) -> str:
     unit_name = f"tc001-color-camera@{src_video_index}.service"
     return f"/run/systemd/system/{unit_name}.d/10-launcher.conf"
 
 
-def _runtime_dst_video_index(src_video_index: int) -> Optional[int]:
-    dropin_path = _runtime_dropin_path(src_video_index)
+def _read_runtime_dropin_fields(
+    dropin_path: str,
+) -> Tuple[Optional[int], Optional[str]]:
     try:
         content = _read_text(dropin_path)
     except Exception:
-        return None
-    match = re.search(r"--dst-video-index\s+(\d+)", content)
-    if not match:
-        return None
-    try:
-        return int(match.group(1))
-    except Exception:
-        return None
+        return None, None
+    dst_video_index: Optional[int] = None
+    match = _RE_DST_VIDEO_INDEX.search(content)
+    if match:
+        with contextlib.suppress(Exception):
+            dst_video_index = int(match.group(1))
+    dst_name_key: Optional[str] = None
+    match = _RE_DST_NAME_KEY.search(content)
+    if match:
+        dst_name_key = str(match.group(1))
+    return dst_video_index, dst_name_key
 
 
-def _runtime_dst_name_key(src_video_index: int) -> Optional[str]:
-    dropin_path = _runtime_dropin_path(src_video_index)
+def _remove_last_good_source(dropin_path: str) -> None:
+    # The instance caches its last working source node per USB device; it
+    # goes away together with the drop-in that names that device.
     try:
         content = _read_text(dropin_path)
     except Exception:
-        return None
-    match = re.search(r"--dst-name-key\s+([0-9a-f]{10})", content)
-    if not match:
-        return None
-    return str(match.group(1))
+        return
+    match = _RE_USB_BUS_DEV.search(content)
+    if match is None:
+        return
+    bus, dev = int(match.group(1)), int(match.group(2))
+    with contextlib.suppress(OSError):
+        os.unlink(_instance_run_path(bus, dev, ".src"))
 
 
-def _remove_runtime_dropin(src_video_index: int) -> bool:
-    dropin_path = _runtime_dropin_path(src_video_index)
+def _remove_runtime_dropin(dropin_path: str) -> bool:
     dropin_dir = os.path.dirname(dropin_path)
     removed = False
     try:
@@ -373,6 +303,7 @@ def _reconcile_dst_video_index(v4l2loopback_ctl: str, *, physical_key: str) -> i
     loopbacks = _list_tc001_loopback_nodes()
     connected_keys = _connected_tc001_identity_keys()
     connected_keys.add(physical_key)
+    _busy = _busy_node_checker()
 
     by_key: dict[str, List[Tuple[int, str, Optional[str]]]] = {}
     for record in loopbacks:
@@ -382,28 +313,32 @@ def _reconcile_dst_video_index(v4l2loopback_ctl: str, *, physical_key: str) -> i
         by_key.setdefault(node_key, []).append(record)
 
     reuse_dst_video_index: Optional[int] = None
+    deleted: set[int] = set()
     for node_key, records in by_key.items():
         ordered = sorted(records, key=lambda item: item[0])
         keeper_idx, keeper_node, _ = ordered[0]
         for idx, node, _ in ordered:
-            if _video_node_busy(node):
+            if _busy(node):
                 keeper_idx = idx
                 keeper_node = node
                 break
         for idx, node, _ in ordered:
             if idx == keeper_idx and node == keeper_node:
                 continue
-            if _video_node_busy(node):
+            if _busy(node):
                 continue
-            _delete_tc001_loopback_dst_unlocked(
+            if _delete_tc001_loopback_dst_unlocked(
                 v4l2loopback_ctl, idx, expected_key=node_key
-            )
+            ):
+                deleted.add(idx)
         if node_key == physical_key:
             reuse_dst_video_index = keeper_idx
 
-    loopbacks = _list_tc001_loopback_nodes()
+    # Deletions are verified, so the first listing minus them is current.
+    if deleted:
+        loopbacks = [record for record in loopbacks if record[0] not in deleted]
     for idx, node, node_key in loopbacks:
-        state = _loopback_state(node_key, connected_keys, _video_node_busy(node))
+        state = _loopback_state(node_key, connected_keys, _busy(node))
         if state != "orphan-idle":
             continue
         _delete_tc001_loopback_dst_unlocked(
@@ -441,19 +376,33 @@ def _launch_runtime_instance(src_video_index: int) -> int:
             f"(expected 0bda:5830, got {got})"
         )
 
-    _wait_for_tc001_device_nodes(src, timeout_s=1.0)
-    sibling_nodes = [n for n in _sysfs_sibling_devices(src) if _is_tc001(n)]
+    src_siblings = _wait_for_tc001_device_nodes(src, timeout_s=1.0)
+    sibling_nodes = [n for n in src_siblings if _is_tc001(n)]
     if src not in sibling_nodes:
         sibling_nodes.insert(0, src)
     physical_key = _tc001_identity_key(src)
+    dropin_path = _runtime_dropin_path(src_video_index)
+
+    # Duplicate udev events for a camera whose instance is already up.
+    running_dst_video_index, running_key = _read_runtime_dropin_fields(dropin_path)
+    if (
+        running_dst_video_index is not None
+        and running_key == physical_key
+        and _unit_is_active(systemctl, unit_name)
+    ):
+        print(
+            f"Launch: {unit_name} already running "
+            f"dst-index={running_dst_video_index} key={physical_key}",
+            file=sys.stderr,
+        )
+        return 0
+
     configured_dst_video_index = _configured_dst_video_index(systemctl, unit_name)
 
-    if not os.path.isdir("/sys/module/v4l2loopback"):
-        _run([modprobe, "v4l2loopback", "devices=0"])
+    _load_v4l2loopback(modprobe)
 
-    v4l2_lock_fd = _acquire_v4l2loopback_lock()
     dst_video_index = -1
-    try:
+    with _v4l2_lock():
         if configured_dst_video_index is None:
             dst_video_index = _reconcile_dst_video_index(
                 v4l2loopback_ctl, physical_key=physical_key
@@ -469,28 +418,29 @@ def _launch_runtime_instance(src_video_index: int) -> int:
                 physical_key=physical_key,
                 keep_dst_video_index=dst_video_index,
             )
-    finally:
-        with contextlib.suppress(Exception):
-            os.close(v4l2_lock_fd)
 
-    dropin_path = ""
     try:
         bus, dev = _video_usb_bus_device_numbers(src)
-        _remove_runtime_dropin(src_video_index)
-        dropin_path = _write_runtime_dropin(
-            src_video_index=src_video_index,
+        if _write_runtime_dropin(
+            dropin_path,
             dst_video_index=dst_video_index,
             dst_name_key=physical_key,
             allowed_video_nodes=sibling_nodes,
             bus=bus,
             dev=dev,
-        )
-        _run([systemctl, "daemon-reload"])
-        _run([systemctl, "start", unit_name])
+        ):
+            _run([systemctl, "daemon-reload"])
+        # Only queue the start job so udev is not held up; a unit that then
+        # fails to start is reported in the journal, not through this path.
+        _run([systemctl, "--no-block", "start", unit_name])
     except Exception:
-        _run([v4l2loopback_ctl, "delete", str(dst_video_index)], check=False)
-        _remove_runtime_dropin(src_video_index)
-        _run([systemctl, "daemon-reload"], check=False)
+        _delete_tc001_loopback_dst(
+            v4l2loopback_ctl, dst_video_index, expected_key=physical_key
+        )
+        _remove_last_good_source(dropin_path)
+        # Only reload if the unit's drop-ins on disk changed.
+        if _remove_runtime_dropin(dropin_path):
+            _run([systemctl, "daemon-reload"], check=False)
         raise
 
     print(
@@ -507,13 +457,12 @@ def _cleanup_runtime_instance(src_video_index: int) -> int:
     systemctl = _which("systemctl")
     v4l2loopback_ctl = _which("v4l2loopback-ctl")
     unit_name = f"tc001-color-camera@{src_video_index}.service"
-    dst_video_index = _runtime_dst_video_index(src_video_index)
-    dst_name_key = _runtime_dst_name_key(src_video_index)
+    dropin_path = _runtime_dropin_path(src_video_index)
+    dst_video_index, dst_name_key = _read_runtime_dropin_fields(dropin_path)
     _run([systemctl, "stop", unit_name], check=False)
     if dst_video_index is not None:
         dst = f"/dev/video{dst_video_index}"
-        v4l2_lock_fd = _acquire_v4l2loopback_lock()
-        try:
+        with _v4l2_lock():
             node_key = dst_name_key or _tc001_loopback_node_key(dst)
             connected_keys = _connected_tc001_identity_keys()
             if node_key is not None and node_key in connected_keys:
@@ -538,10 +487,8 @@ def _cleanup_runtime_instance(src_video_index: int) -> int:
                     "matching removable TC001 loopback node",
                     file=sys.stderr,
                 )
-        finally:
-            with contextlib.suppress(Exception):
-                os.close(v4l2_lock_fd)
-    if _remove_runtime_dropin(src_video_index):
+    _remove_last_good_source(dropin_path)
+    if _remove_runtime_dropin(dropin_path):
         _run([systemctl, "daemon-reload"], check=False)
         print(
             "Cleanup: removed runtime drop-in for "
@@ -1,22 +1,62 @@
 #!/usr/bin/env python3
 import argparse
+import concurrent.futures
 import contextlib
 import ctypes
-import ctypes.util
 import errno
 import fcntl
-import hashlib
+import functools
+import importlib.util
 import os
 import re
 import select
 import signal
+import struct
 import subprocess  # nosec B404: required; calls use argv lists without shell
 import sys
+import termios
 import threading
 import time
-from array import array
 from typing import Callable, Iterable, List, Optional, Sequence, Tuple
 
+
+def _load_common_module():
+    common_path = os.path.join(
+        os.path.dirname(os.path.abspath(__file__)),
+        "tc001-color-camera-common.py",
+    )
+    spec = importlib.util.spec_from_file_location(
+        "tc001_color_camera_common", common_path
+    )
+    if spec is None or spec.loader is None:
+        raise RuntimeError(f"Failed to load common module from {common_path}")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+_common = _load_common_module()
+
+_TC001_LOOPBACK_NAME = _common._TC001_LOOPBACK_NAME
+_which = _common._which
+_run = _common._run
+_read_small = _common._read_small
+_parse_nonnegative_int = _common._parse_nonnegative_int
+_require_root = _common._require_root
+_video_usb_vid_pid = _common._video_usb_vid_pid
+_video_usb_bus_device_numbers = _common._video_usb_bus_device_numbers
+_is_tc001 = _common._is_tc001
+_tc001_identity_key = _common._tc001_identity_key
+_tc001_loopback_name_for_key = _common._tc001_loopback_name_for_key
+_lowest_free_video_nr = _common._lowest_free_video_nr
+_wait_for_tc001_device_nodes = _common._wait_for_tc001_device_nodes
+_is_tc001_loopback_node = _common._is_tc001_loopback_node
+_v4l2_lock = _common._v4l2_lock
+_create_loopback_device = _common._create_loopback_device
+_load_v4l2loopback = _common._load_v4l2loopback
+_libc = _common._libc
+_instance_run_path = _common._instance_run_path
+
 _THERMAL_SHM_DIR = "/dev/shm/sensors/camera/thermal"
 _THERMAL_SHM_FILES = {
     "min": os.path.join(_THERMAL_SHM_DIR, "temperature_min"),
@@ -25,9 +65,16 @@ _THERMAL_SHM_FILES = {
 }
 _THERMAL_SHM_ZONE_IDS = range(1, 10)
 _THERMAL_SHM_ZONE_KEYS = ("min", "median", "max")
+# Overall then zones 1..9, each as (min, max, median) little-endian float32.
+_THERMAL_SHM_PACKED_FILE = os.path.join(_THERMAL_SHM_DIR, "stats.bin")
+_THERMAL_SHM_PACKED = struct.Struct(f"<{3 * (1 + len(_THERMAL_SHM_ZONE_IDS))}f")
+_NAN_STATS = (float("nan"),) * 3
 _THERMAL_TELEMETRY_DISABLED = False
-_TC001_LOOPBACK_NAME = "TC001 Color Camera"
-_TC001_LOOPBACK_KEY_RE = re.compile(r"^TC001 Color Camera \[([0-9a-f]{10})\]$")
+_THERMAL_STATS_FDS: dict[str, int] = {}
+_THERMAL_TELEMETRY_EXECUTOR: Optional[concurrent.futures.ThreadPoolExecutor] = None
+_THERMAL_TELEMETRY_PENDING: Optional[concurrent.futures.Future] = None
+_THERMAL_TELEMETRY_BUF = bytearray()
+_THERMAL_TELEMETRY_U16 = memoryview(_THERMAL_TELEMETRY_BUF)
 
 
 def _thermal_zone_file(zone_id: int, key: str) -> str:
@@ -52,53 +99,51 @@ def _split_3_bounds(size: int) -> Tuple[int, int, int, int]:
     return (b0, b1, b2, b3)
 
 
-def _median_from_sorted(values: Sequence[int]) -> float:
+def _min_max_median(values: List[int]) -> Tuple[float, float, float]:
+    # Sorts values in place.
     n = len(values)
     if n == 0:
         raise ValueError("median of empty sequence")
+    values.sort()
     if n % 2 == 0:
-        return (values[(n // 2) - 1] + values[n // 2]) / 2.0
-    return float(values[n // 2])
-
-
-def _thermal_stats_k64(
-    thermal_u16: memoryview, width: int, height: int
-) -> Tuple[Tuple[float, float, float], dict[int, Tuple[float, float, float]]]:
-    temps_k = list(thermal_u16)
-    temps_k.sort()
-    overall = (
-        float(temps_k[0]),
-        float(temps_k[-1]),
-        _median_from_sorted(temps_k),
-    )
+        median = (values[(n // 2) - 1] + values[n // 2]) / 2.0
+    else:
+        median = float(values[n // 2])
+    return (float(values[0]), float(values[-1]), median)
 
-    x0, x1, x2, x3 = _split_3_bounds(width)
-    y0, y1, y2, y3 = _split_3_bounds(height)
-    x_bounds = (x0, x1, x2, x3)
-    y_bounds = (y0, y1, y2, y3)
 
-    zones: dict[int, Tuple[float, float, float]] = {}
+@functools.lru_cache(maxsize=8)
+def _zone_rects(width: int, height: int) -> Tuple[Tuple[int, int, int, int], ...]:
+    # (xs, xe, ys, ye) per zone, in zone id order.
+    x_bounds = _split_3_bounds(width)
+    y_bounds = _split_3_bounds(height)
+    rects: List[Tuple[int, int, int, int]] = []
     for zone_id in _THERMAL_SHM_ZONE_IDS:
         row = (zone_id - 1) // 3
         col = (zone_id - 1) % 3
-        xs = x_bounds[col]
-        xe = x_bounds[col + 1]
-        ys = y_bounds[row]
-        ye = y_bounds[row + 1]
+        rects.append(
+            (x_bounds[col], x_bounds[col + 1], y_bounds[row], y_bounds[row + 1])
+        )
+    return tuple(rects)
+
 
+def _thermal_stats_k64_rects(
+    thermal_u16: memoryview, width: int, rects: Sequence[Tuple[int, int, int, int]]
+) -> Tuple[Tuple[float, float, float], dict[int, Tuple[float, float, float]]]:
+    zones: dict[int, Tuple[float, float, float]] = {}
+    # The zones tile the frame, so the overall values come from the sorted
+    # zone runs; timsort merges the 9 presorted runs in near-linear time.
+    temps_k: List[int] = []
+    for zone_id, (xs, xe, ys, ye) in zip(_THERMAL_SHM_ZONE_IDS, rects):
         zone_vals: List[int] = []
         for y in range(ys, ye):
             i0 = (y * width) + xs
             i1 = (y * width) + xe
             zone_vals.extend(thermal_u16[i0:i1])
-        zone_vals.sort()
-        zones[zone_id] = (
-            float(zone_vals[0]),
-            float(zone_vals[-1]),
-            _median_from_sorted(zone_vals),
-        )
+        zones[zone_id] = _min_max_median(zone_vals)
+        temps_k.extend(zone_vals)
 
-    return overall, zones
+    return _min_max_median(temps_k), zones
 
 
 def _rotated_dimensions(width: int, height: int, rotate: str) -> Tuple[int, int]:
@@ -139,6 +184,35 @@ def _center_crop_bounds(
     return (x0, y0, crop_w, crop_h)
 
 
+@functools.lru_cache(maxsize=8)
+def _visible_zone_rects(
+    width: int, height: int, rotate: str, out_w: int, out_h: int
+) -> Tuple[Tuple[int, int, int, int], ...]:
+    rot_w, rot_h = _rotated_dimensions(width, height, rotate)
+    crop_x, crop_y, crop_w, crop_h = _center_crop_bounds(rot_w, rot_h, out_w, out_h)
+
+    # Min/max/median do not depend on pixel order, so instead of building a
+    # rotated copy, map each visible zone back to its source rectangle
+    # (rotation by multiples of 90 keeps rectangles axis-aligned).
+    rects: List[Tuple[int, int, int, int]] = []
+    for xs, xe, ys, ye in _zone_rects(crop_w, crop_h):
+        xs += crop_x
+        xe += crop_x
+        ys += crop_y
+        ye += crop_y
+        if rotate == "0":
+            rects.append((xs, xe, ys, ye))
+        elif rotate == "90":
+            rects.append((ys, ye, height - xe, height - xs))
+        elif rotate == "180":
+            rects.append((width - xe, width - xs, height - ye, height - ys))
+        elif rotate == "270":
+            rects.append((width - ye, width - ys, xs, xe))
+        else:
+            raise ValueError(f"rotate must be one of 0/90/180/270, got {rotate}")
+    return tuple(rects)
+
+
 def _thermal_stats_k64_visible(
     thermal_u16: memoryview,
     width: int,
@@ -149,47 +223,9 @@ def _thermal_stats_k64_visible(
     out_h: int,
 ) -> Tuple[Tuple[float, float, float], dict[int, Tuple[float, float, float]]]:
     # Compute stats only on the thermal portion visible in the output video.
-    rot_w, rot_h = _rotated_dimensions(width, height, rotate)
-    crop_x, crop_y, crop_w, crop_h = _center_crop_bounds(rot_w, rot_h, out_w, out_h)
-
-    # Build a contiguous u16 buffer in the same orientation/crop as output.
-    visible = array("H")
-    for yr in range(crop_y, crop_y + crop_h):
-        for xr in range(crop_x, crop_x + crop_w):
-            if rotate == "0":
-                x = xr
-                y = yr
-            elif rotate == "90":
-                x = yr
-                y = height - 1 - xr
-            elif rotate == "180":
-                x = width - 1 - xr
-                y = height - 1 - yr
-            elif rotate == "270":
-                x = width - 1 - yr
-                y = xr
-            else:
-                raise ValueError(f"rotate must be one of 0/90/180/270, got {rotate}")
-
-            visible.append(int(thermal_u16[(y * width) + x]))
-
-    return _thermal_stats_k64(memoryview(visible), crop_w, crop_h)
-
-
-def _which(cmd: str) -> str:
-    trusted_dirs = (
-        "/usr/local/sbin",
-        "/usr/local/bin",
-        "/usr/sbin",
-        "/usr/bin",
-        "/sbin",
-        "/bin",
-    )
-    for path_dir in trusted_dirs:
-        candidate = os.path.join(path_dir, cmd)
-        if os.path.isfile(candidate) and os.access(candidate, os.X_OK):
-            return candidate
-    raise FileNotFoundError(f"{cmd} not found in trusted dirs {':'.join(trusted_dirs)}")
+    # The geometry is fixed for the stream, so the zone rectangles are cached.
+    rects = _visible_zone_rects(width, height, rotate, out_w, out_h)
+    return _thermal_stats_k64_rects(thermal_u16, width, rects)
 
 
 def _clamp_int(name: str, value: int, low: int, high: int) -> int:
@@ -231,13 +267,6 @@ def _parse_dst_resolution(resolution: str) -> Tuple[int, int]:
     return (out_w, out_h)
 
 
-def _parse_nonnegative_int(raw: str, flag_name: str) -> int:
-    text = raw.strip()
-    if not text.isdigit():
-        raise ValueError(f"{flag_name} must be a non-negative integer (e.g. 2)")
-    return int(text)
-
-
 def _parse_ffc_disable_after(raw: Optional[str]) -> Optional[float]:
     if raw is None:
         return None
@@ -260,24 +289,6 @@ def _parse_ffc_disable_after(raw: Optional[str]) -> Optional[float]:
     return delay
 
 
-def _require_root() -> None:
-    if os.geteuid() != 0:
-        raise PermissionError(
-            "Must run as root (needs access to device nodes and /run lock " "files)."
-        )
-
-
-def _run(cmd: Sequence[str], *, check: bool = True) -> subprocess.CompletedProcess:
-    return subprocess.run(  # nosec B603: trusted executable/arg vectors only
-        cmd, check=check, stdin=subprocess.DEVNULL
-    )
-
-
-def _read_text(path: str) -> str:
-    with open(path, "r", encoding="utf-8") as file_handle:
-        return file_handle.read().strip()
-
-
 def _kelvin64_to_celsius(k: float) -> float:
     return (k / 64.0) - 273.15
 
@@ -299,15 +310,37 @@ def _ensure_thermal_stats_dir() -> None:
         os.makedirs(directory, mode=0o755, exist_ok=True)
 
 
-def _write_thermal_text_file(path: str, text: str) -> None:
-    with open(path, "w", encoding="utf-8") as file_handle:
-        file_handle.write(text)
+def _thermal_stats_fd(path: str) -> int:
+    # Files are rewritten every tick; keep them open for the process lifetime.
+    fd = _THERMAL_STATS_FDS.get(path)
+    if fd is None:
+        _ensure_thermal_stats_dir()
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_CLOEXEC, 0o644)
+        _THERMAL_STATS_FDS[path] = fd
+    return fd
 
 
-def _clear_thermal_stats() -> None:
-    _ensure_thermal_stats_dir()
-    for path in _thermal_stats_paths():
-        _write_thermal_text_file(path, "")
+def _write_thermal_file(path: str, data: bytes) -> None:
+    fd = _thermal_stats_fd(path)
+    os.ftruncate(fd, 0)
+    os.pwrite(fd, data, 0)
+
+
+def _write_thermal_packed(values: Sequence[float]) -> None:
+    # Fixed-size record rewritten in place and never truncated, so a reader
+    # that mmaps the file never sees it shrink.
+    os.pwrite(
+        _thermal_stats_fd(_THERMAL_SHM_PACKED_FILE),
+        _THERMAL_SHM_PACKED.pack(*values),
+        0,
+    )
+
+
+def _clear_thermal_stats(*, text_files: bool = True) -> None:
+    if text_files:
+        for path in _thermal_stats_paths():
+            _write_thermal_file(path, b"")
+    _write_thermal_packed(_NAN_STATS * (1 + len(_THERMAL_SHM_ZONE_IDS)))
 
 
 def _write_thermal_stats(
@@ -316,39 +349,44 @@ def _write_thermal_stats(
     median_c: float,
     *,
     zone_stats: Optional[dict[int, Tuple[float, float, float]]] = None,
+    text_files: bool = True,
 ) -> None:
-    _ensure_thermal_stats_dir()
-    _write_thermal_text_file(_THERMAL_SHM_FILES["min"], f"{min_c:.1f}\n")
-    _write_thermal_text_file(_THERMAL_SHM_FILES["max"], f"{max_c:.1f}\n")
-    _write_thermal_text_file(_THERMAL_SHM_FILES["median"], f"{median_c:.1f}\n")
+    packed = [min_c, max_c, median_c]
+    for zone_id in _THERMAL_SHM_ZONE_IDS:
+        packed.extend((zone_stats or {}).get(zone_id, _NAN_STATS))
+    _write_thermal_packed(packed)
+    if not text_files:
+        return
+    _write_thermal_file(_THERMAL_SHM_FILES["min"], b"%.1f\n" % min_c)
+    _write_thermal_file(_THERMAL_SHM_FILES["max"], b"%.1f\n" % max_c)
+    _write_thermal_file(_THERMAL_SHM_FILES["median"], b"%.1f\n" % median_c)
     if zone_stats:
         for zone_id in _THERMAL_SHM_ZONE_IDS:
             stats = zone_stats.get(zone_id)
             if stats is None:
                 continue
             zone_min_c, zone_max_c, zone_median_c = stats
-            _write_thermal_text_file(
-                _thermal_zone_file(zone_id, "min"), f"{zone_min_c:.1f}\n"
+            _write_thermal_file(
+                _thermal_zone_file(zone_id, "min"), b"%.1f\n" % zone_min_c
             )
-            _write_thermal_text_file(
-                _thermal_zone_file(zone_id, "max"), f"{zone_max_c:.1f}\n"
+            _write_thermal_file(
+                _thermal_zone_file(zone_id, "max"), b"%.1f\n" % zone_max_c
             )
-            _write_thermal_text_file(
-                _thermal_zone_file(zone_id, "median"), f"{zone_median_c:.1f}\n"
+            _write_thermal_file(
+                _thermal_zone_file(zone_id, "median"), b"%.1f\n" % zone_median_c
             )
 
 
-def _update_thermal_stats_from_frame(
-    frame_buf: bytes,
+def _update_thermal_stats(
+    thermal_u16: memoryview,
     *,
-    picture_bytes: int,
     width: int,
     height: int,
     rotate: str,
     out_w: int,
     out_h: int,
+    text_files: bool = True,
 ) -> None:
-    thermal_u16 = memoryview(frame_buf)[picture_bytes:].cast("H")
     overall_k, zones_k = _thermal_stats_k64_visible(
         thermal_u16, width, height, rotate=rotate, out_w=out_w, out_h=out_h
     )
@@ -365,6 +403,7 @@ def _update_thermal_stats_from_frame(
         _kelvin64_to_celsius(overall_k[1]),
         _kelvin64_to_celsius(overall_k[2]),
         zone_stats=zones_c,
+        text_files=text_files,
     )
 
 
@@ -380,13 +419,55 @@ def _try_thermal_telemetry(operation, *args, **kwargs) -> None:
         print(f"Thermal telemetry disabled: {exc}", file=sys.stderr)
 
 
+def _submit_thermal_stats_from_frame(
+    frame_buf: bytes, *, picture_bytes: int, **kwargs
+) -> None:
+    global _THERMAL_TELEMETRY_EXECUTOR, _THERMAL_TELEMETRY_PENDING
+    global _THERMAL_TELEMETRY_BUF, _THERMAL_TELEMETRY_U16
+    if _THERMAL_TELEMETRY_DISABLED:
+        return
+    # Stats run off the streaming loop; a tick is dropped while the previous
+    # one is still being computed.
+    pending = _THERMAL_TELEMETRY_PENDING
+    if pending is not None and not pending.done():
+        return
+    if _THERMAL_TELEMETRY_EXECUTOR is None:
+        _THERMAL_TELEMETRY_EXECUTOR = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="tc001-temps"
+        )
+    # The caller reuses the frame buffer, so the thermal half is copied into
+    # a scratch buffer; the worker is idle here, so the scratch is free too.
+    thermal = memoryview(frame_buf)[picture_bytes:]
+    if len(_THERMAL_TELEMETRY_BUF) != len(thermal):
+        _THERMAL_TELEMETRY_BUF = bytearray(len(thermal))
+        _THERMAL_TELEMETRY_U16 = memoryview(_THERMAL_TELEMETRY_BUF).cast("H")
+    _THERMAL_TELEMETRY_BUF[:] = thermal
+    _THERMAL_TELEMETRY_PENDING = _THERMAL_TELEMETRY_EXECUTOR.submit(
+        _try_thermal_telemetry,
+        _update_thermal_stats,
+        _THERMAL_TELEMETRY_U16,
+        **kwargs,
+    )
+
+
+def _shutdown_thermal_telemetry() -> None:
+    global _THERMAL_TELEMETRY_EXECUTOR, _THERMAL_TELEMETRY_PENDING
+    if _THERMAL_TELEMETRY_EXECUTOR is not None:
+        _THERMAL_TELEMETRY_EXECUTOR.shutdown(wait=True)
+    _THERMAL_TELEMETRY_EXECUTOR = None
+    _THERMAL_TELEMETRY_PENDING = None
+
+
 def _build_palette_lut(
     points: Sequence[Tuple[float, Tuple[int, int, int]]]
-) -> List[bytes]:
+) -> Tuple[bytes, bytes, bytes]:
     if not points or points[0][0] != 0.0 or points[-1][0] != 1.0:
         raise ValueError("palette must start at 0.0 and end at 1.0")
 
-    lut: List[bytes] = []
+    # One 256-byte table per channel, usable directly with bytes.translate().
+    lut_r = bytearray(256)
+    lut_g = bytearray(256)
+    lut_b = bytearray(256)
     j = 0
     for i in range(256):
         t = i / 255.0
@@ -401,27 +482,72 @@ def _build_palette_lut(
             r = int(round(c0[0] + (c1[0] - c0[0]) * f))
             g = int(round(c0[1] + (c1[1] - c0[1]) * f))
             b = int(round(c0[2] + (c1[2] - c0[2]) * f))
-        lut.append(bytes((r, g, b)))
-    return lut
-
-
-def _colorize_gray_frame(frame: bytes, lut: Sequence[bytes]) -> bytes:
+        lut_r[i] = r
+        lut_g[i] = g
+        lut_b[i] = b
+    return (bytes(lut_r), bytes(lut_g), bytes(lut_b))
+
+
+def _colorize_gray_frame(
+    frame: bytes,
+    lut: Tuple[bytes, bytes, bytes],
+    out: Optional[bytearray] = None,
+) -> bytearray:
+    if out is None:
+        out = bytearray(len(frame) * 3)
+    elif len(out) != len(frame) * 3:
+        raise ValueError("out must hold 3 bytes per input pixel")
     lo = min(frame)
     hi = max(frame)
     if hi <= lo:
-        return b"\x00\x00\x00" * len(frame)
+        out[:] = bytes(len(out))
+        return out
 
     span = hi - lo
-    out = bytearray(len(frame) * 3)
-    oi = 0
-    for p in frame:
-        idx = (p - lo) * 255 // span
-        rgb = lut[idx]
-        out[oi] = rgb[0]
-        out[oi + 1] = rgb[1]
-        out[oi + 2] = rgb[2]
-        oi += 3
-    return bytes(out)
+    # Fold the min/max stretch and the palette into one 256-entry table per
+    # channel, then map the whole frame in C with bytes.translate().
+    stretch = bytes((min(max(p, lo), hi) - lo) * 255 // span for p in range(256))
+    for channel, channel_lut in enumerate(lut):
+        out[channel::3] = frame.translate(stretch.translate(channel_lut))
+    return out
+
+
+def _set_pipe_size(pipe, size: int) -> int:
+    # The default 64 KiB pipe is smaller than one frame. Ask for one frame; the
+    # kernel rounds up to a power-of-two number of pages, so read back the
+    # real capacity instead of assuming the requested size.
+    fd = pipe.fileno()
+    try:
+        fcntl.fcntl(fd, getattr(fcntl, "F_SETPIPE_SZ", 1031), size)
+    except OSError as exc:
+        print(f"Pipe resize to {size} bytes failed: {exc}", file=sys.stderr)
+    try:
+        return fcntl.fcntl(fd, getattr(fcntl, "F_GETPIPE_SZ", 1032))
+    except OSError:
+        return 65536
+
+
+def _pipe_queued_bytes(fd: int) -> int:
+    try:
+        raw = fcntl.ioctl(fd, termios.FIONREAD, b"\x00\x00\x00\x00")
+    except OSError:
+        return 0
+    return struct.unpack("i", raw)[0]
+
+
+def _pipe_backlogged(fd: int, pipe_size: int, frame_len: int) -> bool:
+    # A frame is dropped only when an earlier one is still queued and this one
+    # would not fit behind it. An empty pipe always takes the frame, even when
+    # it is smaller than a frame (e.g. the resize was refused) and the write
+    # has to block until the reader catches up.
+    queued = _pipe_queued_bytes(fd)
+    return queued > 0 and pipe_size - queued < frame_len
+
+
+def _write_all(fd: int, data: bytes) -> None:
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view) :]
 
 
 def _iter_exact_frames(
@@ -430,14 +556,18 @@ def _iter_exact_frames(
     *,
     should_stop: Optional[Callable[[], bool]] = None,
     poll_interval_s: float = 0.25,
-) -> Iterable[bytes]:
+) -> Iterable[bytearray]:
     if frame_size <= 0:
         raise ValueError("frame_size must be > 0")
     if poll_interval_s <= 0:
         raise ValueError("poll_interval_s must be > 0")
 
     fd = stream.fileno()
-    pending = bytearray()
+    # Frames are read straight into one reused buffer; the yielded frame is
+    # only valid until the next iteration.
+    frame = bytearray(frame_size)
+    view = memoryview(frame)
+    filled = 0
     while True:
         if should_stop is not None and should_stop():
             return
@@ -447,168 +577,14 @@ def _iter_exact_frames(
             continue
         if not readable:
             continue
-        chunk = os.read(fd, frame_size - len(pending))
-        if not chunk:
+        n = os.readv(fd, [view[filled:]])
+        if not n:
             return
-        pending.extend(chunk)
-        if len(pending) < frame_size:
-            continue
-        yield bytes(pending)
-        pending.clear()
-
-
-def _sysfs_sibling_devices(preferred: str) -> List[str]:
-    video_basename = os.path.basename(preferred)
-    sys_link = f"/sys/class/video4linux/{video_basename}/device"
-    try:
-        dev_real = os.path.realpath(sys_link)
-    except OSError:
-        return [preferred]
-
-    base = "/sys/class/video4linux"
-    try:
-        entries = os.listdir(base)
-    except OSError:
-        return [preferred]
-
-    candidates: List[str] = []
-    for entry in entries:
-        if not entry.startswith("video"):
-            continue
-        try:
-            entry_real = os.path.realpath(os.path.join(base, entry, "device"))
-        except OSError:
-            continue
-        if entry_real == dev_real:
-            candidates.append(f"/dev/{entry}")
-
-    def _video_num(video_path: str) -> int:
-        try:
-            return int(os.path.basename(video_path).replace("video", ""))
-        except Exception:
-            return 1_000_000
-
-    candidates = sorted(set(candidates), key=_video_num)
-    if preferred in candidates:
-        candidates.remove(preferred)
-        candidates.insert(0, preferred)
-    return candidates or [preferred]
-
-
-def _lowest_free_video_nr() -> int:
-    used = set()
-    try:
-        entries = os.listdir("/dev")
-    except OSError as exc:
-        raise RuntimeError(f"Cannot list /dev: {exc}") from exc
-
-    for name in entries:
-        if not name.startswith("video"):
+        filled += n
+        if filled < frame_size:
             continue
-        suffix = name[5:]
-        if suffix.isdigit():
-            used.add(int(suffix))
-
-    n = 0
-    while n in used:
-        n += 1
-    return n
-
-
-def _sysfs_video_dir(video_node: str) -> str:
-    video_basename = os.path.basename(video_node)
-    return os.path.realpath(f"/sys/class/video4linux/{video_basename}/device")
-
-
-def _sysfs_find_up(start_dir: str, filenames: Sequence[str]) -> Optional[str]:
-    current_dir = start_dir
-    while current_dir.startswith("/sys/") and current_dir != "/sys":
-        if all(
-            os.path.exists(os.path.join(current_dir, filename))
-            for filename in filenames
-        ):
-            return current_dir
-        current_dir = os.path.dirname(current_dir)
-    return None
-
-
-def _video_usb_vid_pid(video_node: str) -> Optional[Tuple[int, int]]:
-    try:
-        dev_dir = _sysfs_video_dir(video_node)
-    except Exception:
-        return None
-
-    found = _sysfs_find_up(dev_dir, ("idVendor", "idProduct"))
-    if not found:
-        return None
-    try:
-        vid = int(_read_text(os.path.join(found, "idVendor")), 16)
-        pid = int(_read_text(os.path.join(found, "idProduct")), 16)
-        return vid, pid
-    except Exception:
-        return None
-
-
-def _video_usb_bus_device_numbers(video_node: str) -> Tuple[int, int]:
-    dev_dir = _sysfs_video_dir(video_node)
-    found = _sysfs_find_up(dev_dir, ("busnum", "devnum"))
-    if not found:
-        raise RuntimeError(f"Unable to locate USB busnum/devnum for {video_node}")
-    bus = int(_read_text(os.path.join(found, "busnum")))
-    dev = int(_read_text(os.path.join(found, "devnum")))
-    return bus, dev
-
-
-def _is_tc001(video_node: str) -> bool:
-    ids = _video_usb_vid_pid(video_node)
-    return ids == (0x0BDA, 0x5830)
-
-
-def _tc001_usb_identity(video_node: str) -> str:
-    ids = _video_usb_vid_pid(video_node)
-    if ids is None:
-        raise RuntimeError(f"Unable to identify USB VID:PID for {video_node}")
-    vid, pid = ids
-    dev_dir = _sysfs_video_dir(video_node)
-    found = _sysfs_find_up(dev_dir, ("idVendor", "idProduct"))
-
-    serial = ""
-    path_key = ""
-    if found:
-        path_key = os.path.basename(found)
-        serial_path = os.path.join(found, "serial")
-        try:
-            if os.path.exists(serial_path):
-                serial = _read_text(serial_path)
-        except Exception:
-            serial = ""
-
-    if serial:
-        return f"vid={vid:04x};pid={pid:04x};serial={serial}"
-    if path_key:
-        return f"vid={vid:04x};pid={pid:04x};path={path_key}"
-
-    bus, dev = _video_usb_bus_device_numbers(video_node)
-    return f"vid={vid:04x};pid={pid:04x};bus={bus:03d};dev={dev:03d}"
-
-
-def _tc001_identity_key(video_node: str) -> str:
-    identity = _tc001_usb_identity(video_node)
-    digest = hashlib.sha1(  # nosec B303: non-cryptographic stable key derivation
-        identity.encode("utf-8")
-    ).hexdigest()
-    return digest[:10]
-
-
-def _tc001_loopback_name_for_key(key: str) -> str:
-    return f"{_TC001_LOOPBACK_NAME} [{key}]"
-
-
-def _parse_tc001_loopback_name(name: str) -> Tuple[bool, Optional[str]]:
-    match = _TC001_LOOPBACK_KEY_RE.fullmatch(name)
-    if not match:
-        return False, None
-    return True, match.group(1)
+        yield frame
+        filled = 0
 
 
 def _parse_dst_name_key(raw: str) -> str:
@@ -618,25 +594,6 @@ def _parse_dst_name_key(raw: str) -> str:
     return key
 
 
-def _is_tc001_loopback_node(
-    video_node: str, *, expected_key: Optional[str] = None
-) -> bool:
-    video_basename = os.path.basename(video_node)
-    class_dir = f"/sys/class/video4linux/{video_basename}"
-    try:
-        name = _read_text(os.path.join(class_dir, "name"))
-        dev_real = os.path.realpath(os.path.join(class_dir, "device"))
-    except Exception:
-        return False
-
-    is_tc001_name, node_key = _parse_tc001_loopback_name(name)
-    if not is_tc001_name:
-        return False
-    if expected_key is not None and node_key != expected_key:
-        return False
-    return dev_real.startswith("/sys/devices/virtual/video4linux/")
-
-
 def _find_tc001_video(prefer: str = "/dev/video0") -> str:
     if os.path.exists(prefer) and _is_tc001(prefer):
         return prefer
@@ -665,7 +622,7 @@ def _find_tc001_video(prefer: str = "/dev/video0") -> str:
         idx_path = f"/sys/class/video4linux/{video_basename}/index"
         index_value: Optional[str] = None
         try:
-            index_value = _read_text(idx_path)
+            index_value = _read_small(idx_path)
         except Exception:
             index_value = None
         if index_value == "0":
@@ -673,30 +630,9 @@ def _find_tc001_video(prefer: str = "/dev/video0") -> str:
     return candidates[0]
 
 
-def _wait_for_tc001_device_nodes(video_node: str, timeout_s: float = 1.0) -> None:
-    start = time.monotonic()
-    while time.monotonic() - start < timeout_s:
-        nodes = _sysfs_sibling_devices(video_node)
-        indices = set()
-        for node in nodes:
-            video_basename = os.path.basename(node)
-            idx_path = f"/sys/class/video4linux/{video_basename}/index"
-            index_value: Optional[str] = None
-            try:
-                index_value = _read_text(idx_path)
-            except Exception:
-                index_value = None
-            if index_value is None:
-                continue
-            indices.add(index_value)
-        if "0" in indices and "1" in indices:
-            return
-        time.sleep(0.05)
-
-
 def _acquire_single_instance_lock(video_node: str) -> Tuple[int, str]:
     bus, dev = _video_usb_bus_device_numbers(video_node)
-    lock_path = f"/run/tc001-color-camera-{bus:03d}-{dev:03d}.lock"
+    lock_path = _instance_run_path(bus, dev, ".lock")
     flags = os.O_RDWR | os.O_CREAT
     if hasattr(os, "O_CLOEXEC"):
         flags |= os.O_CLOEXEC
@@ -714,57 +650,25 @@ def _acquire_single_instance_lock(video_node: str) -> Tuple[int, str]:
     return fd, lock_path
 
 
-def _acquire_v4l2loopback_lock() -> Tuple[int, str]:
-    lock_path = "/run/tc001-color-camera-v4l2loopback.lock"
-    flags = os.O_RDWR | os.O_CREAT
-    if hasattr(os, "O_CLOEXEC"):
-        flags |= os.O_CLOEXEC
-    fd = os.open(lock_path, flags, 0o644)
+def _read_last_good_source(cache_path: str) -> Optional[str]:
     try:
-        fcntl.flock(fd, fcntl.LOCK_EX)
-    except Exception:
-        os.close(fd)
-        raise
-    return fd, lock_path
-
-
-def _create_loopback_device(
-    v4l2loopback_ctl: str,
-    dst_video_index: int,
-    *,
-    loopback_name: str,
-    expected_key: Optional[str] = None,
-    timeout_s: float = 2.5,
-) -> str:
-    dst = f"/dev/video{dst_video_index}"
-    _run(
-        [
-            v4l2loopback_ctl,
-            "add",
-            "--name",
-            loopback_name,
-            "--exclusive-caps",
-            "1",
-            str(dst_video_index),
-        ]
-    )
+        return _read_small(cache_path) or None
+    except OSError:
+        return None
 
-    deadline = time.monotonic() + timeout_s
-    seen_path = False
-    while time.monotonic() < deadline:
-        if os.path.exists(dst):
-            seen_path = True
-            if _is_tc001_loopback_node(dst, expected_key=expected_key):
-                return dst
-        time.sleep(0.05)
 
-    _run([v4l2loopback_ctl, "delete", str(dst_video_index)], check=False)
-    if seen_path:
-        raise RuntimeError(
-            f"Created destination --dst-video-index {dst_video_index} ({dst}) "
-            "is not a TC001 loopback node"
-        )
-    raise FileNotFoundError(dst)
+def _write_last_good_source(cache_path: str, video_node: str) -> None:
+    tmp_path = f"{cache_path}.tmp"
+    try:
+        flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_CLOEXEC
+        fd = os.open(tmp_path, flags, 0o644)
+        try:
+            os.write(fd, f"{video_node}\n".encode("utf-8"))
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
 
 
 def _read_exact_with_timeout(stream, frame_size: int, timeout_s: float) -> bytes:
@@ -825,11 +729,11 @@ def _usbdevfs_ioctl_iowr(size: int) -> int:
     return req
 
 
+_USBDEVFS_CONTROL = _usbdevfs_ioctl_iowr(ctypes.sizeof(_UsbdevfsCtrlTransfer))
+
+
 def _usbdevfs_control(fd: int, transfer: _UsbdevfsCtrlTransfer) -> None:
-    libc_path = ctypes.util.find_library("c") or "libc.so.6"
-    libc = ctypes.CDLL(libc_path, use_errno=True)
-    req = _usbdevfs_ioctl_iowr(ctypes.sizeof(_UsbdevfsCtrlTransfer))
-    res = libc.ioctl(fd, req, ctypes.byref(transfer))
+    res = _libc().ioctl(fd, _USBDEVFS_CONTROL, ctypes.byref(transfer))
     if res < 0:
         err = ctypes.get_errno()
         raise OSError(err, os.strerror(err))
@@ -970,6 +874,14 @@ def main(argv: Sequence[str]) -> int:
             "seconds (default: 1)."
         ),
     )
+    parser.add_argument(
+        "--temps-packed-only",
+        action="store_true",
+        help=(
+            "Write temperatures only to the packed stats.bin file, skipping "
+            "the per-value temperature_* text files."
+        ),
+    )
     parser.add_argument(
         "--dst-video-index",
         default=None,
@@ -1015,17 +927,18 @@ def main(argv: Sequence[str]) -> int:
             f"(expected 0bda:5830, got {got})"
         )
 
-    _lock_fd, _lock_path = _acquire_single_instance_lock(src)
-    _try_thermal_telemetry(_clear_thermal_stats)
+    _lock_fd, lock_path = _acquire_single_instance_lock(src)
+    temps_text_files = not args.temps_packed_only
+    _try_thermal_telemetry(_clear_thermal_stats, text_files=temps_text_files)
     temps_every = _clamp_float("--temps-every", float(args.temps_every), 0.1, 3600.0)
     fps = _clamp_int("--fps", int(args.fps), 1, 60)
     out_w, out_h = _parse_dst_resolution(args.dst_resolution)
     ffc_disable_after = _parse_ffc_disable_after(args.ffc_disable_after)
 
-    if (not args.skip_modprobe) and (not os.path.isdir("/sys/module/v4l2loopback")):
-        _run([modprobe, "v4l2loopback", "devices=0"])
+    if not args.skip_modprobe:
+        _load_v4l2loopback(modprobe)
 
-    _wait_for_tc001_device_nodes(src, timeout_s=1.0)
+    src_siblings = _wait_for_tc001_device_nodes(src, timeout_s=1.0)
 
     dst_name_key: Optional[str] = None
     if args.dst_name_key is not None:
@@ -1051,17 +964,13 @@ def main(argv: Sequence[str]) -> int:
         if not os.path.exists(dst):
             # Recovery path for restarts where a prior run already deleted the
             # pre-created node during cleanup.
-            v4l2_lock_fd, _v4l2_lock_path = _acquire_v4l2loopback_lock()
-            try:
+            with _v4l2_lock():
                 _create_loopback_device(
                     v4l2loopback_ctl,
                     int(dst_video_index),
                     loopback_name=loopback_name,
                     expected_key=dst_name_key,
                 )
-            finally:
-                with contextlib.suppress(Exception):
-                    os.close(v4l2_lock_fd)
         if not _is_tc001_loopback_node(dst, expected_key=dst_name_key):
             raise RuntimeError(
                 "--dst-precreated expected a TC001 loopback node at "
@@ -1071,17 +980,13 @@ def main(argv: Sequence[str]) -> int:
     else:
         # Serialize destination index selection/device creation across
         # all instances.
-        v4l2_lock_fd, _v4l2_lock_path = _acquire_v4l2loopback_lock()
-        try:
+        with _v4l2_lock():
             _create_loopback_device(
                 v4l2loopback_ctl,
                 int(dst_video_index),
                 loopback_name=loopback_name,
                 expected_key=dst_name_key,
             )
-        finally:
-            with contextlib.suppress(Exception):
-                os.close(v4l2_lock_fd)
 
     # False-color palette with black->blue->green->yellow->orange->white.
     lut = _build_palette_lut(
@@ -1108,6 +1013,17 @@ def main(argv: Sequence[str]) -> int:
             "-hide_banner",
             "-loglevel",
             "error",
+            # Live source: no probing or input buffering ahead of the first frame.
+            "-fflags",
+            "nobuffer",
+            "-flags",
+            "low_delay",
+            "-probesize",
+            "32",
+            "-analyzeduration",
+            "0",
+            "-thread_queue_size",
+            "8",
             "-f",
             "v4l2",
             "-input_format",
@@ -1129,7 +1045,7 @@ def main(argv: Sequence[str]) -> int:
     if args.rotate == "90":
         vf_parts.append("transpose=clock")
     elif args.rotate == "180":
-        vf_parts.append("transpose=clock,transpose=clock")
+        vf_parts.append("hflip,vflip")
     elif args.rotate == "270":
         vf_parts.append("transpose=cclock")
     vf_parts.append(
@@ -1145,6 +1061,10 @@ def main(argv: Sequence[str]) -> int:
         "-hide_banner",
         "-loglevel",
         "error",
+        "-fflags",
+        "+nobuffer",
+        "-max_delay",
+        "0",
         "-f",
         "rawvideo",
         "-pix_fmt",
@@ -1176,9 +1096,17 @@ def main(argv: Sequence[str]) -> int:
     signal.signal(signal.SIGTERM, _handle_signal)
     signal.signal(signal.SIGINT, _handle_signal)
 
+    # Probe the node that streamed last time for this camera first; the cache
+    # sits next to the instance lock and goes away with the USB device number.
+    src_cache_path = f"{os.path.splitext(lock_path)[0]}.src"
+    last_good_src = _read_last_good_source(src_cache_path)
+    if last_good_src in src_siblings:
+        src_siblings.remove(last_good_src)
+        src_siblings.insert(0, last_good_src)
+
     first_buf = b""
     probe_errors: List[str] = []
-    for candidate in _sysfs_sibling_devices(src):
+    for candidate in src_siblings:
         proc = subprocess.Popen(  # nosec B603: internal ffmpeg argv builder, no shell
             _reader_cmd(candidate),
             stdout=subprocess.PIPE,
@@ -1188,12 +1116,15 @@ def main(argv: Sequence[str]) -> int:
         try:
             if proc.stdout is None:
                 raise RuntimeError("ffmpeg reader stdout pipe not available")
+            _set_pipe_size(proc.stdout, frame_size)
             probe = _read_exact_with_timeout(proc.stdout, frame_size, timeout_s=2.0)
             if len(probe) != frame_size:
                 raise RuntimeError("short read")
             reader = proc
             first_buf = probe
             src = candidate
+            if candidate != last_good_src:
+                _write_last_good_source(src_cache_path, candidate)
             break
         except Exception as exc:
             probe_errors.append(f"{candidate}: {exc}")
@@ -1249,14 +1180,22 @@ def main(argv: Sequence[str]) -> int:
         if writer.stdin is None:
             raise RuntimeError("ffmpeg writer stdin pipe not available")
         frame_period = 1.0 / float(fps)
+        # One RGB24 output frame, refilled in place for every written frame.
+        rgb_out = bytearray((picture_bytes // 2) * 3)
+        writer_pipe_size = _set_pipe_size(writer.stdin, len(rgb_out))
+        writer_fd = writer.stdin.fileno()
+        dropped_frames = 0
         now = time.monotonic()
         next_output_at = now
         next_temp_write = now
+        next_drop_log = now
         if first_buf and not stopping:
             first_gray = first_buf[:picture_bytes:2]
             if now >= next_output_at:
                 try:
-                    writer.stdin.write(_colorize_gray_frame(first_gray, lut))
+                    _write_all(
+                        writer_fd, _colorize_gray_frame(first_gray, lut, rgb_out)
+                    )
                 except (BrokenPipeError, OSError) as exc:
                     is_epipe_while_stopping = False
                     if stopping and isinstance(exc, OSError):
@@ -1269,8 +1208,7 @@ def main(argv: Sequence[str]) -> int:
                     next_output_at += frame_period
 
             if not stopping:
-                _try_thermal_telemetry(
-                    _update_thermal_stats_from_frame,
+                _submit_thermal_stats_from_frame(
                     first_buf,
                     picture_bytes=picture_bytes,
                     width=width,
@@ -1278,6 +1216,7 @@ def main(argv: Sequence[str]) -> int:
                     rotate=args.rotate,
                     out_w=out_w,
                     out_h=out_h,
+                    text_files=temps_text_files,
                 )
                 next_temp_write = now + temps_every
 
@@ -1289,23 +1228,34 @@ def main(argv: Sequence[str]) -> int:
 
             loop_now = time.monotonic()
             if loop_now >= next_output_at:
-                gray = buf[:picture_bytes:2]
-                try:
-                    writer.stdin.write(_colorize_gray_frame(gray, lut))
-                except (BrokenPipeError, OSError) as exc:
-                    is_epipe_while_stopping = False
-                    if stopping and isinstance(exc, OSError):
-                        is_epipe_while_stopping = exc.errno == errno.EPIPE
-                    if not is_epipe_while_stopping:
-                        raise
-                    break
-                loop_now = time.monotonic()
-                while next_output_at <= loop_now:
-                    next_output_at += frame_period
+                if _pipe_backlogged(writer_fd, writer_pipe_size, len(rgb_out)):
+                    # The writer is still draining an earlier frame and this one
+                    # would not fit without blocking; drop it instead of
+                    # queueing it behind the backlog.
+                    dropped_frames += 1
+                    if loop_now >= next_drop_log:
+                        print(
+                            f"Writer busy: dropped {dropped_frames} frames so far",
+                            file=sys.stderr,
+                        )
+                        next_drop_log = loop_now + 10.0
+                else:
+                    gray = buf[:picture_bytes:2]
+                    try:
+                        _write_all(writer_fd, _colorize_gray_frame(gray, lut, rgb_out))
+                    except (BrokenPipeError, OSError) as exc:
+                        is_epipe_while_stopping = False
+                        if stopping and isinstance(exc, OSError):
+                            is_epipe_while_stopping = exc.errno == errno.EPIPE
+                        if not is_epipe_while_stopping:
+                            raise
+                        break
+                    loop_now = time.monotonic()
+                    while next_output_at <= loop_now:
+                        next_output_at += frame_period
 
             if loop_now >= next_temp_write:
-                _try_thermal_telemetry(
-                    _update_thermal_stats_from_frame,
+                _submit_thermal_stats_from_frame(
                     buf,
                     picture_bytes=picture_bytes,
                     width=width,
@@ -1313,6 +1263,7 @@ def main(argv: Sequence[str]) -> int:
                     rotate=args.rotate,
                     out_w=out_w,
                     out_h=out_h,
+                    text_files=temps_text_files,
                 )
                 next_temp_write = loop_now + temps_every
         else:
@@ -1344,7 +1295,8 @@ def main(argv: Sequence[str]) -> int:
                 with contextlib.suppress(Exception):
                     proc.kill()
         _run([v4l2loopback_ctl, "delete", str(dst_video_index)], check=False)
-        _try_thermal_telemetry(_clear_thermal_stats)
+        _shutdown_thermal_telemetry()
+        _try_thermal_telemetry(_clear_thermal_stats, text_files=temps_text_files)
 
     if stream_failed:
         raise RuntimeError("TC001 stream ended unexpectedly.")
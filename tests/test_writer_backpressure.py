@@ -0,0 +1,70 @@
+import contextlib
+import errno
+import fcntl
+import importlib.util
+import io
+import os
+import unittest
+from unittest import mock
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_spec = importlib.util.spec_from_file_location(
+    "tc001_color_camera", os.path.join(_ROOT, "tc001-color-camera.py")
+)
+camera = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(camera)
+
+_RGB24_FRAME = 256 * 192 * 3
+
+
+class WriterBackpressureTest(unittest.TestCase):
+    def setUp(self):
+        read_fd, write_fd = os.pipe()
+        self.reader = os.fdopen(read_fd, "rb")
+        self.writer = os.fdopen(write_fd, "wb")
+        self.addCleanup(self.reader.close)
+        self.addCleanup(self.writer.close)
+
+    def _set_pipe_size_refused(self):
+        real_fcntl = fcntl.fcntl
+
+        def _fcntl(fd, cmd, arg=0):
+            if cmd == getattr(fcntl, "F_SETPIPE_SZ", 1031):
+                raise PermissionError(errno.EPERM, "Operation not permitted")
+            return real_fcntl(fd, cmd, arg)
+
+        stderr = io.StringIO()
+        with mock.patch.object(camera.fcntl, "fcntl", _fcntl):
+            with contextlib.redirect_stderr(stderr):
+                size = camera._set_pipe_size(self.writer, _RGB24_FRAME)
+        return size, stderr.getvalue()
+
+    def test_refused_resize_keeps_default_capacity_and_logs(self):
+        size, log = self._set_pipe_size_refused()
+        self.assertEqual(size, 65536)
+        self.assertIn("Pipe resize", log)
+
+    def test_empty_small_pipe_still_takes_frames(self):
+        size, _ = self._set_pipe_size_refused()
+        fd = self.writer.fileno()
+        self.assertFalse(camera._pipe_backlogged(fd, size, _RGB24_FRAME))
+
+    def test_small_pipe_with_queued_data_drops_frame(self):
+        size, _ = self._set_pipe_size_refused()
+        fd = self.writer.fileno()
+        os.write(fd, bytes(4096))
+        self.assertTrue(camera._pipe_backlogged(fd, size, _RGB24_FRAME))
+
+    def test_frame_sized_pipe_drops_only_when_frame_does_not_fit(self):
+        size = camera._set_pipe_size(self.writer, _RGB24_FRAME)
+        if size < _RGB24_FRAME + 4096:
+            self.skipTest("pipe could not be resized above one frame")
+        fd = self.writer.fileno()
+        os.write(fd, bytes(4096))
+        self.assertFalse(camera._pipe_backlogged(fd, size, _RGB24_FRAME))
+        os.write(fd, bytes(_RGB24_FRAME))
+        self.assertTrue(camera._pipe_backlogged(fd, size, _RGB24_FRAME))
+
+
+if __name__ == "__main__":
+    unittest.main()